@@ -7,6 +7,9 @@ https://docs.aws.amazon.com/apigateway/latest/developerguide/apigateway-use-lamb
 
 import json
 import logging
+import os
+import threading
+import time
 
 from hydrocron.utils import connection
 
@@ -14,9 +17,109 @@ from hydrocron.utils import connection
 logging.getLogger().setLevel(logging.INFO)
 
 
-ssm_client = connection.ssm_client
-STORED_API_KEY_TRUSTED = ssm_client.get_parameter(Name="/service/hydrocron/api-key-trusted", WithDecryption=True)["Parameter"]["Value"]
-STORED_API_KEY_DEFAULT = ssm_client.get_parameter(Name="/service/hydrocron/api-key-default", WithDecryption=True)["Parameter"]["Value"]
+API_KEY_DEFAULT_PARAMETER = "/service/hydrocron/api-key-default"
+API_KEY_TRUSTED_PARAMETER = "/service/hydrocron/api-key-trusted"
+MAX_CACHED_POLICIES = 1024
+
+
+class ApiKeyStore:
+    """
+    API keys read from SSM on first use and refreshed once they are older
+    than the TTL, with the trusted key list parsed once per refresh. Policies
+    are cached by (API key, method ARN) until the next refresh, and are looked
+    up, built and cached under the same lock as the refresh so a policy built
+    from revoked keys is never cached.
+    """
+
+    def __init__(self, ttl: float = 300, clock=time.monotonic):
+        """
+        @param ttl: float - Seconds before the keys are read again, keys are kept for the process lifetime when 0
+        @param clock: callable - Returns the current time in seconds
+        """
+
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._expires = None
+        self._default_key = ""
+        self._trusted_keys = frozenset()
+        self._policies = {}
+
+    def keys(self):
+        """
+        Return the default API key and the trusted API keys, reading them
+        from SSM when they have not been loaded or have expired. The last
+        keys read are kept when a refresh fails.
+
+        @return: tuple of the default key and a frozenset of trusted keys
+        """
+
+        with self._lock:
+            return self._current_keys()
+
+    def get_policy(self, api_key_trusted, method_arn):
+        """
+        Return the authorizer response for an API key and method ARN.
+
+        @param api_key_trusted: str - Value of the x-hydrocron-key header
+        @param method_arn: str - ARN of the method being invoked
+        @return: dict - A new dict on each call, the cache keeps the policy JSON
+        """
+
+        with self._lock:
+            default_key, trusted_keys = self._current_keys()
+            trusted = bool(api_key_trusted) and api_key_trusted in trusted_keys
+            cache_key = (api_key_trusted if trusted else "", method_arn)
+
+            policy = self._policies.get(cache_key)
+            if policy is None:
+                if trusted:
+                    policy = create_policy("trusted_partner", "Allow", method_arn, api_key_trusted)
+                    logging.info("Created policy for truster partner.")
+                else:
+                    policy = create_policy("default_user", "Allow", method_arn, default_key)
+                    logging.info("Created policy for default user.")
+                if len(self._policies) >= MAX_CACHED_POLICIES:
+                    self._policies.pop(next(iter(self._policies)))
+                self._policies[cache_key] = policy
+        return json.loads(policy)
+
+    def _current_keys(self):
+        """
+        Return the keys, refreshing them when they have not been loaded or
+        have expired. Must be called with the lock held.
+
+        @return: tuple of the default key and a frozenset of trusted keys
+        """
+
+        now = self._clock()
+        if self._expires is None or now >= self._expires:
+            try:
+                self._load()
+            except Exception:  # pylint: disable=broad-exception-caught
+                if self._expires is None:
+                    raise
+                logging.exception("Could not refresh API keys, using the keys read previously.")
+            self._expires = now + self.ttl if self.ttl > 0 else float("inf")
+        return self._default_key, self._trusted_keys
+
+    def _load(self):
+        """Read both API key parameters from SSM in one request."""
+
+        response = connection.ssm_client.get_parameters(
+            Names=[API_KEY_DEFAULT_PARAMETER, API_KEY_TRUSTED_PARAMETER],
+            WithDecryption=True
+        )
+        if response["InvalidParameters"]:
+            raise KeyError(f"SSM parameters not found: {', '.join(response['InvalidParameters'])}")
+
+        values = {parameter["Name"]: parameter["Value"] for parameter in response["Parameters"]}
+        self._default_key = values[API_KEY_DEFAULT_PARAMETER]
+        self._trusted_keys = frozenset(json.loads(values[API_KEY_TRUSTED_PARAMETER]))
+        self._policies = {}
+
+
+API_KEY_STORE = ApiKeyStore(float(os.getenv("API_KEY_TTL", "300")))
 
 
 def authorization_handler(event, context):
@@ -26,18 +129,10 @@ def authorization_handler(event, context):
     logging.info("Context: %s", context)
 
     api_key_trusted = "" if "x-hydrocron-key" not in event["headers"].keys() else event["headers"]["x-hydrocron-key"]
-    trusted_key_list = json.loads(STORED_API_KEY_TRUSTED)
-
-    if api_key_trusted and api_key_trusted in trusted_key_list:
-        response_policy = create_policy("trusted_partner", "Allow", event["methodArn"], api_key_trusted)
-        logging.info("Created policy for truster partner.")
-
-    else:
-        response_policy = create_policy("default_user", "Allow", event["methodArn"], STORED_API_KEY_DEFAULT)
-        logging.info("Created policy for default user.")
+    response_policy = API_KEY_STORE.get_policy(api_key_trusted, event["methodArn"])
 
     logging.info("Response: %s", response_policy)
-    return json.loads(response_policy)
+    return response_policy
 
 
 def create_policy(principle_id, effect, method_arn, api_key=""):
@@ -3,19 +3,24 @@ Hydrocron API timeseries controller
 """
 # pylint: disable=R0801
 # pylint: disable=C0103
+import base64
+import csv
 import datetime
+import hashlib
+import hmac
+import io
 import json
 import logging
 import os
+import re
+import secrets
 import sys
 import time
 
 from accept_types import get_best_match
-import pandas as pd
-import geopandas as gpd
-from shapely.wkt import loads
 
-from hydrocron.api.data_access.db import DynamoDataRepository
+from hydrocron.api.data_access.cache import ResponseCache
+from hydrocron.api.data_access.db import DynamoDataRepository, PayloadTooLarge, ResponseSizeEstimator
 from hydrocron.utils import connection
 from hydrocron.utils import constants
 
@@ -24,9 +29,20 @@ logging.getLogger().setLevel(logging.INFO)
 
 
 ACCEPT_TYPES = ['application/json', 'text/csv', 'application/geo+json']
+MAX_RESPONSE_SIZE = 6291456    # Lambda synchronous response payload limit
 DEFAULT_RIVER_COLLECTION = os.environ['DEFAULT_RIVER_COLLECTION']
 DEFAULT_LAKE_COLLECTION = os.environ['DEFAULT_LAKE_COLLECTION']
 DEFAULT_COLLECTION_VERSION = os.environ['DEFAULT_COLLECTION_VERSION']
+WKT_PATTERN = re.compile(r'(POINT|LINESTRING|POLYGON) \((.*)\)')
+GEOJSON_TYPES = {'POINT': 'Point', 'LINESTRING': 'LineString', 'POLYGON': 'Polygon'}
+PAGE_TOKEN_SECRET = os.getenv('PAGE_TOKEN_SECRET', '').encode()
+if not PAGE_TOKEN_SECRET:
+    if os.getenv('HYDROCRON_ENV', 'prod').lower() not in ('test', 'local'):
+        raise RuntimeError('PAGE_TOKEN_SECRET is not set, page tokens would only be valid on the instance that issued them')
+    PAGE_TOKEN_SECRET = secrets.token_bytes(32)   # Tokens are only valid on the instance that issued them
+MAX_FEATURE_IDS = int(os.getenv('MAX_FEATURE_IDS', '100'))
+RESPONSE_CACHE = ResponseCache(int(os.getenv('RESPONSE_CACHE_SIZE', '0')), float(os.getenv('RESPONSE_CACHE_TTL', '0')))
+DATA_REPOSITORIES = []   # Repository reused across requests while the DynamoDB resource is unchanged
 
 
 class RequestError(Exception):
@@ -75,6 +91,8 @@ def get_request_parameters(event, accept_header):
         if accept_header == 'application/geo+json':   # Default is different for geo+json
             parameters['compact'] = 'true' if 'compact' not in event['body'].keys() else event['body']['compact']
         parameters['collection_name'] = get_collection_name(event)
+        parameters['limit'] = None if 'limit' not in event['body'].keys() else event['body']['limit']
+        parameters['page_token'] = None if 'page_token' not in event['body'].keys() else event['body']['page_token']
     except KeyError as e:
         raise RequestError(f'400: This required parameter is missing: {e}') from e
 
@@ -85,10 +103,20 @@ def get_request_parameters(event, accept_header):
     parameters['fields'] = [field.strip() for field in parameters['fields'].split(',') if field.strip()]
     parameters['fields'] = ','.join(parameters['fields'])
 
+    # remove spaces and duplicates from feature_id list
+    parameters['feature_id'] = [feature_id.strip() for feature_id in parameters['feature_id'].split(',') if feature_id.strip()]
+    parameters['feature_id'] = ','.join(dict.fromkeys(parameters['feature_id']))
+
     error_message = validate_parameters(parameters)
     if error_message:
         raise RequestError(error_message)
 
+    if parameters['limit']:
+        parameters['limit'] = int(parameters['limit'])
+    parameters['exclusive_start_key'] = None
+    if parameters['page_token']:
+        parameters['exclusive_start_key'] = decode_page_token(parameters['page_token'], get_page_token_scope(parameters))
+
     return parameters
 
 
@@ -170,9 +198,12 @@ def validate_parameters(parameters):
     elif parameters['feature'] not in ('Node', 'Reach', 'PriorLake'):
         error_message = f'400: feature parameter should be Reach, Node, or PriorLake, not: {parameters["feature"]}'
 
-    elif not parameters['feature_id'].isdigit():
+    elif not all(feature_id.isdigit() for feature_id in parameters['feature_id'].split(',')):
         error_message = f'400: feature_id cannot contain letters: {parameters["feature_id"]}'
 
+    elif len(parameters['feature_id'].split(',')) > MAX_FEATURE_IDS:
+        error_message = f'400: feature_id should contain at most {MAX_FEATURE_IDS} IDs'
+
     elif not is_date_valid(parameters['start_time']) or not is_date_valid(parameters['end_time']):
         error_message = ('400: start_time and end_time parameters must conform '
                          'to format: YYYY-MM-DDTHH:MM:SSZ or YYYY-MM-DDTHH:MM:SS-00:00')
@@ -192,6 +223,12 @@ def validate_parameters(parameters):
     elif parameters['compact'] not in ('true', 'false'):
         error_message = f'400: compact parameter should be true or false, not {parameters["compact"]}'
 
+    elif parameters['limit'] is not None and not (parameters['limit'].isdigit() and int(parameters['limit']) > 0):
+        error_message = f'400: limit parameter should be a positive integer, not: {parameters["limit"]}'
+
+    elif (parameters['limit'] or parameters['page_token']) and ',' in parameters['feature_id']:
+        error_message = '400: limit and page_token parameters are only supported for a single feature_id'
+
     else:
         parameters['start_time'], parameters['end_time'] = sanitize_time(parameters['start_time'], parameters['end_time'])
 
@@ -283,7 +320,75 @@ def sanitize_time(start_time, end_time):
     return start_time, end_time
 
 
-def timeseries_get(collection_name, feature, feature_id, start_time, end_time, output, fields):  # pylint: disable=too-many-arguments,too-many-positional-arguments
+def get_page_token_scope(parameters):
+    """Return the request parameters a page token is bound to. A token is
+    only accepted for the same feature and time range it was issued for.
+
+    :param parameters: Dictionary of query parameters
+    :type parameters: dict
+
+    :rtype: str
+    """
+
+    return '|'.join([parameters['collection_name'], parameters['feature'], parameters['feature_id'],
+                     parameters['start_time'], parameters['end_time']])
+
+
+def encode_page_token(last_evaluated_key, scope):
+    """Encode a DynamoDB LastEvaluatedKey as an opaque page token signed
+    with an HMAC over the key and the request scope.
+
+    :param last_evaluated_key: Primary key of the last item returned
+    :type last_evaluated_key: dict
+    :param scope: Request parameters the token is bound to
+    :type scope: str
+
+    :rtype: str
+    """
+
+    payload = base64.urlsafe_b64encode(json.dumps(last_evaluated_key, sort_keys=True, separators=(',', ':')).encode())
+    signature = hmac.new(PAGE_TOKEN_SECRET, payload + scope.encode(), hashlib.sha256).digest()
+    return f"{payload.decode().rstrip('=')}.{base64.urlsafe_b64encode(signature).decode().rstrip('=')}"
+
+
+def decode_page_token(page_token, scope):
+    """Verify a page token and return the DynamoDB ExclusiveStartKey it
+    encodes.
+
+    :param page_token: Page token returned by a previous request
+    :type page_token: str
+    :param scope: Request parameters the token is bound to
+    :type scope: str
+
+    :rtype: dict
+    """
+
+    try:
+        payload, signature = (part + '=' * (-len(part) % 4) for part in page_token.split('.'))
+        expected = hmac.new(PAGE_TOKEN_SECRET, payload.encode() + scope.encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(base64.urlsafe_b64decode(signature), expected):
+            raise ValueError('Signature mismatch')
+        exclusive_start_key = json.loads(base64.urlsafe_b64decode(payload))
+    except ValueError as e:
+        raise RequestError('400: page_token is not valid for this request') from e
+    return exclusive_start_key
+
+
+def get_data_repository():
+    """Return the data repository for the current DynamoDB resource,
+    created once per container so table handles are reused.
+
+    :rtype: DynamoDataRepository
+    """
+
+    dynamodb_resource = connection.dynamodb_resource
+    if not DATA_REPOSITORIES or DATA_REPOSITORIES[0]._dynamo_instance is not dynamodb_resource:  # pylint: disable=protected-access
+        DATA_REPOSITORIES[:] = [DynamoDataRepository(dynamodb_resource)]
+    return DATA_REPOSITORIES[0]
+
+
+def timeseries_get(collection_name, feature, feature_id, start_time, end_time, output, fields,  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+                   limit=None, exclusive_start_key=None, compact=False):
     """Get Timeseries for a particular Reach, Node, or LakeID
 
     Get Timeseries for a particular Reach, Node, or LakeID # noqa: E501
@@ -292,7 +397,7 @@ def timeseries_get(collection_name, feature, feature_id, start_time, end_time, o
     :type collection_name: str
     :param feature: Data requested for Reach or Node or Lake
     :type feature: str
-    :param feature_id: ID of the feature to retrieve
+    :param feature_id: ID of the feature to retrieve, or a comma separated list of IDs
     :type feature_id: str
     :param start_time: Start time of the timeseries
     :type start_time: str
@@ -302,6 +407,12 @@ def timeseries_get(collection_name, feature, feature_id, start_time, end_time, o
     :type output: str
     :param fields: List of requested columns
     :type fields: str
+    :param limit: Maximum number of results to return
+    :type limit: int
+    :param exclusive_start_key: Primary key to resume the query after
+    :type exclusive_start_key: dict
+    :param compact: Whether a compact GeoJSON response will be returned
+    :type compact: bool
 
     :rtype: Dict, integer
     """
@@ -310,138 +421,283 @@ def timeseries_get(collection_name, feature, feature_id, start_time, end_time, o
     data = {}
     hits = 0
 
-    data_repository = DynamoDataRepository(connection.dynamodb_resource)
+    # Paged requests are not cached, sub-collections share the watermark of the table they are read from.
+    # The watermark only advances on a miss, so responses can be stale for up to RESPONSE_CACHE_TTL
+    cache_key = (collection_name, feature, feature_id, start_time, end_time, fields, output, compact)
+    cache_collection = (constants.SHORTNAME.get(collection_name, collection_name), feature)
+    use_cache = RESPONSE_CACHE.enabled and not limit and not exclusive_start_key
+    if use_cache:
+        cached = RESPONSE_CACHE.get(cache_key, cache_collection)
+        logging.info('response_cache: %s', json.dumps(RESPONSE_CACHE.stats()))
+        if cached:
+            return cached
+
+    data_repository = get_data_repository()
+    attributes = get_projection_attributes(fields, output)
+    if use_cache:
+        attributes.append('ingest_time')
+    size_estimator = ResponseSizeEstimator(MAX_RESPONSE_SIZE, keyed=output == 'geojson')
+    feature_ids = feature_id.split(',')
     try:
-        results = data_repository.get_series_by_feature_id(collection_name, feature, feature_id, start_time, end_time)
+        if len(feature_ids) > 1:
+            feature_results = data_repository.get_series_by_feature_ids(collection_name, feature, feature_ids, start_time, end_time,
+                                                                        attributes, size_estimator)
+            results = {'Items': [item for feature_result in feature_results for item in feature_result['Items']]}
+        else:
+            results = data_repository.get_series_by_feature_id(collection_name, feature, feature_id, start_time, end_time,
+                                                               attributes, size_estimator, limit, exclusive_start_key)
+            feature_results = [results]
     except ValueError as e:
         data['http_code'] = '400 Bad Request'
         data['error_message'] = str(e)
         return data, hits
+    except PayloadTooLarge as e:
+        data['http_code'] = '413 Payload Too Large'
+        data['error_message'] = str(e)
+        return data, hits
 
     if len(results['Items']) == 0:
         data['http_code'] = '400 Bad Request'
         data['error_message'] = f'400: Results with the specified Feature ID {feature_id} were not found'
-    elif sys.getsizeof(results) > 6291456:
-        data['http_code'] = '413 Payload Too Large'
-        data['error_message'] = f'413: Query exceeds 6MB with {sys.getsizeof(results)} hits'
     else:
-        logging.info('query_size: %s', str(sys.getsizeof(results)))
-        gdf = convert_to_df(results['Items'])
+        logging.info('query_size: %s', str(size_estimator.size))
         if output == 'geojson':
-            data, hits = format_json(gdf, fields)
+            data, hits = format_json(results['Items'], fields, compact, [feature_result['Items'] for feature_result in feature_results])
         if output == 'csv':
-            data, hits = format_csv(gdf, fields)
+            data, hits = format_csv(results['Items'], fields)
+        data['last_evaluated_key'] = results.get('LastEvaluatedKey')
+        if use_cache:
+            RESPONSE_CACHE.observe_ingest_time(cache_collection, max(item.get('ingest_time', '') for item in results['Items']))
+            RESPONSE_CACHE.put(cache_key, cache_collection, (data, hits), size_estimator.size)
 
     return data, hits
 
 
-def convert_to_df(items) -> gpd.GeoDataFrame:
-    """Convert reach-level results for GeoPandas Dataframe.
+def get_projection_attributes(fields, output):
+    """Return the DynamoDB attributes required to build a response for the
+    requested fields. Aliased fields are resolved to their source attribute,
+    units attributes are included for each field, and geometry is only
+    included when it was requested or a GeoJSON response is built.
 
-    :param items Dictionary of query results
-    :type items: dict
+    :param fields: List of requested columns
+    :type fields: str
+    :param output: Format of the data returned
+    :type output: str
 
-    :rtype: gpd.GeoDataFrame
+    :rtype: list of str
     """
 
-    df = pd.DataFrame.from_records(items)
-    df['geometry'] = df['geometry'].apply(loads)
-    gdf = gpd.GeoDataFrame(df, geometry='geometry')
-    return gdf
+    attributes = []
+    for field in fields.split(','):
+        attributes.append(constants.FIELD_ALIASES.get(field, field))
+        attributes.append(f"{field}_units")
+    if output == 'geojson':
+        attributes.append('geometry')
+    return list(dict.fromkeys(attributes))
 
 
-def _fill_missing_columns(gdf, columns):
-    """Add missing columns to GeoDataFrame with fill value. Resolves aliases."""
-    # First, ensure all non-alias columns exist and are filled (order-independent).
-    for col in columns:
-        if col == "geometry" or col in constants.FIELD_ALIASES:
-            continue
-        if col not in gdf.columns:
-            gdf[col] = constants.FILL_VALUE
-        else:
-            gdf[col] = gdf[col].fillna(constants.FILL_VALUE)
-
-    # Second, resolve aliases after sources have been created/filled.
-    for alias, source in constants.FIELD_ALIASES.items():
-        if alias not in columns:
-            continue
-        if source in gdf.columns:
-            gdf[alias] = gdf[source].fillna(constants.FILL_VALUE)
-        else:
-            gdf[alias] = constants.FILL_VALUE
+def intern_geometries(wkt, parse):
+    """Parse each distinct WKT geometry string once. Every time step of a
+    feature carries the same geometry so rows share the parsed result.
+
+    :param wkt: WKT geometry strings
+    :type wkt: iterable of str
+    :param parse: Vectorized function converting a list of WKT strings
+    :type parse: callable
+
+    :rtype: dict
+    """
 
-    return gdf
+    distinct = list(dict.fromkeys(wkt))
+    return dict(zip(distinct, parse(distinct)))
 
 
-def format_json(gdf, fields):  # noqa: E501 # pylint: disable=W0613,R0912
+def _wkt_to_geojson(wkt):
+    """Convert a list of WKT strings to GeoJSON geometry objects. Simple
+    geometries are parsed in Python, shapely is only imported for any other
+    geometry."""
+
+    geometries = {None: None}
+    for text in wkt:
+        try:
+            geometries[text] = _parse_simple_wkt(text)
+        except (TypeError, ValueError):
+            pass
+
+    remaining = [text for text in wkt if text not in geometries]
+    if remaining:
+        import shapely  # pylint: disable=import-outside-toplevel
+        geometries.update(zip(remaining, (json.loads(geometry) for geometry in shapely.to_geojson(shapely.from_wkt(remaining)))))
+    return [geometries[text] for text in wkt]
+
+
+def _parse_simple_wkt(wkt):
+    """Convert a 2D POINT, LINESTRING or POLYGON WKT string to a GeoJSON
+    geometry. Raises ValueError for anything else.
+
+    :param wkt: WKT geometry string
+    :type wkt: str
+
+    :rtype: dict
+    """
+
+    match = WKT_PATTERN.fullmatch(wkt)
+    if not match:
+        raise ValueError(f'Unsupported WKT: {wkt[:40]}')
+    geometry_type, body = match.groups()
+
+    if geometry_type == 'POINT':
+        coordinates = _parse_wkt_positions(body)
+        if len(coordinates) != 1:
+            raise ValueError('POINT should contain one position')
+        coordinates = coordinates[0]
+    elif geometry_type == 'LINESTRING':
+        coordinates = _parse_wkt_positions(body)
+    else:
+        if not (body.startswith('(') and body.endswith(')')):
+            raise ValueError('POLYGON rings should be enclosed in parentheses')
+        coordinates = [_parse_wkt_positions(ring) for ring in body[1:-1].split('), (')]
+
+    return {'type': GEOJSON_TYPES[geometry_type], 'coordinates': coordinates}
+
+
+def _parse_wkt_positions(text):
+    """Parse comma separated 2D WKT positions."""
+
+    positions = [[float(value) for value in position.split()] for position in text.split(',')]
+    if any(len(position) != 2 for position in positions):
+        raise ValueError('Only 2D positions are supported')
+    return positions
+
+
+def format_json(items, fields, compact=False, groups=None):  # noqa: E501 # pylint: disable=W0613,R0912
     """ Format the results to the file format that the user selects (geojson)
 
-    :param gdf: DataFrame of results from query
-    :type gdf: gpd.GeoDataFrame
+    The FeatureCollection is built directly from the query items in the same
+    layout GeoDataFrame.to_json produces, without serializing and parsing
+    the response. Units columns present in the items are added after the
+    requested fields, aliases are resolved to their source attribute and
+    missing values are replaced with the fill value.
+
+    A compact response has a feature for each group of items, usually one
+    per feature ID, with the group's first geometry and an array of values
+    for each property, built column by column.
+
+    :param items: List of query result items
+    :type items: list of dict
     :param fields: List of requested columns
     :type fields: str
+    :param compact: Whether to return a compact GeoJSON response
+    :type compact: bool
+    :param groups: Items split by feature ID for compact responses, all items are one group when omitted
+    :type groups: list of list of dict
 
     :rtype: dict, integer
     """
 
-    columns = fields.split(',')
-    columns = add_units(gdf, columns)
-    if 'geometry' not in fields:
-        columns.append('geometry')   # Add geometry to convert to geoJSON
-    gdf = _fill_missing_columns(gdf, columns)
-    gdf = gdf[columns]
-    gdf_json = json.loads(gdf.to_json())
+    columns = [column for column in _get_item_columns(items, fields) if column != 'geometry']
+    sources = [constants.FIELD_ALIASES.get(column, column) for column in columns]
+
+    if compact:
+        groups = [group for group in (groups or [items]) if group]
+        geometries = _wkt_to_geojson([group[0].get('geometry') for group in groups])   # Only the first geometry is returned
+        features = [{
+            'id': str(index),
+            'type': 'Feature',
+            'properties': {column: _get_item_values(group, source) for column, source in zip(columns, sources)},
+            'geometry': geometry
+        } for index, (group, geometry) in enumerate(zip(groups, geometries))]
+
+    else:
+        geometries = intern_geometries((item.get('geometry') for item in items), _wkt_to_geojson)
+        features = []
+        for index, item in enumerate(items):
+            properties = {}
+            for column, source in zip(columns, sources):
+                value = item.get(source)
+                properties[column] = constants.FILL_VALUE if value is None else value
+            features.append({
+                'id': str(index),
+                'type': 'Feature',
+                'properties': properties,
+                'geometry': geometries[item.get('geometry')]
+            })
 
     data = {
         'http_code': '200 OK',
-        'response': gdf_json
+        'response': {
+            'type': 'FeatureCollection',
+            'features': features
+        }
     }
-    hits = gdf.shape[0]
+    hits = len(items)
 
     return data, hits
 
 
-def format_csv(gdf, fields):  # noqa: E501 # pylint: disable=W0613
+def _get_item_values(items, attribute):
+    """Return the values of an attribute across all query items, with fill
+    values for items that are missing it."""
+
+    fill_value = constants.FILL_VALUE
+    return [fill_value if value is None else value for value in (item.get(attribute) for item in items)]
+
+
+def format_csv(items, fields):  # noqa: E501 # pylint: disable=W0613
     """ Format the results to the file format that the user selects (csv)
 
-    :param gdf: DataFrame of results from query
-    :type gdf: gpd.GeoDataFrame
+    Rows are written directly from the query items. Units, aliases and fill
+    values are resolved the same way as in format_json.
+
+    :param items: List of query result items
+    :type items: list of dict
     :param fields: List of requested columns
     :type fields: str
 
     :rtype: dict, integer
     """
 
-    columns = fields.split(',')
-    columns = add_units(gdf, columns)
-    gdf = _fill_missing_columns(gdf, columns)
-    gdf = gdf[columns]
-    gdf_csv = gdf.to_csv(index=False)
+    columns = _get_item_columns(items, fields)
+    sources = [constants.FIELD_ALIASES.get(column, column) for column in columns]
+
+    geometries = {}
+    if 'geometry' in columns:   # Normalize WKT strings to match shapely's output
+        import shapely  # pylint: disable=import-outside-toplevel
+        geometries = intern_geometries((item.get('geometry') for item in items),
+                                       lambda wkt: shapely.to_wkt(shapely.from_wkt(wkt), rounding_precision=-1))
+
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(columns)
+    for item in items:
+        row = []
+        for column, source in zip(columns, sources):
+            value = item.get(source)
+            if column == 'geometry':
+                row.append(geometries.get(value) or '')
+            else:
+                row.append(constants.FILL_VALUE if value is None else value)
+        writer.writerow(row)
 
     data = {
         'http_code': '200 OK',
-        'response': gdf_csv
+        'response': output.getvalue()
     }
-    hits = gdf.shape[0]
+    hits = len(items)
 
     return data, hits
 
 
-def add_units(gdf, columns):
-    """Add units to list of columns to return in response
-
-    :param gdf: DataFrame of results from query
-    :type gdf: gpd.GeoDataFrame
-    :param columns: List of columns to return in response
-    :type columns: list of str
-    """
+def _get_item_columns(items, fields):
+    """Return requested columns followed by the units columns present in the
+    query items, in the order of the requested columns."""
 
-    gdf_columns = gdf.columns.values.tolist()
-    unit_columns = [f"{column}_units" for column in columns if f"{column}_units" in gdf_columns]
-    return columns + unit_columns
+    columns = fields.split(',')
+    item_columns = set().union(*items)
+    return columns + [f"{column}_units" for column in columns if f"{column}_units" in item_columns]
 
 
-def get_response(results, hits, elapsed, return_type, output, compact):  # pylint: disable=too-many-positional-arguments
+def get_response(results, hits, elapsed, return_type, output):
     """Create and return HTTP response based on results.
 
     :param results: Dictionary of SWOT timeseries results
@@ -454,8 +710,6 @@ def get_response(results, hits, elapsed, return_type, output, compact):  # pylin
     :type return_type: str
     :param output: Output to return in request
     :type output: str
-    :param compact: Whether to return compact GeoJSON response
-    :type compact: str
 
     rtype: dict
     """
@@ -463,23 +717,20 @@ def get_response(results, hits, elapsed, return_type, output, compact):  # pylin
     if results['http_code'] == '200 OK':
 
         if return_type in ('text/csv', 'application/geo+json'):
-            if compact == 'true' and return_type == 'application/geo+json':
-                data = compact_results(results['response'])
-            else:
-                data = results['response']
+            data = results['response']
 
         else:  # 'application/json'
             data = {
                 'status': results['http_code'],
                 'time': elapsed,
-                'hits': hits,
-                'results': {
-                    'csv': '',
-                    'geojson': {}
-                    }
-                }
-            if output == 'geojson' and compact == 'true':
-                results['response'] = compact_results(results['response'])
+                'hits': hits
+            }
+            if 'next_page_token' in results:
+                data['next_page_token'] = results['next_page_token']
+            data['results'] = {
+                'csv': '',
+                'geojson': {}
+            }
             data['results'][output] = results['response']
 
     else:
@@ -488,35 +739,6 @@ def get_response(results, hits, elapsed, return_type, output, compact):  # pylin
     return data
 
 
-def compact_results(results):
-    """Compact GeoJSON results to return a properties object with aggregated
-    time series data.
-
-    :param results: Dictionary of SWOT timeseries results
-    :type results: dict
-
-    rtype: dict
-    """
-
-    response = {
-        'type': 'FeatureCollection',
-        'features': [
-            {
-                'id': '0',
-                'type': 'Feature',
-                'properties': {},
-                'geometry': results['features'][0]['geometry']   # Grab first geometry
-            }
-        ]
-    }
-
-    fields = list(results['features'][0]['properties'].keys())
-    for field in fields:
-        response['features'][0]['properties'][field] = [feature['properties'][field] for feature in results['features']]
-
-    return response
-
-
 def lambda_handler(event, context):  # noqa: E501 # pylint: disable=W0613
     """
     This function queries the database for relevant results
@@ -539,6 +761,9 @@ def lambda_handler(event, context):  # noqa: E501 # pylint: disable=W0613
         parameters = get_request_parameters(event, headers['accept'])
         logging.info('collection_name: %s', parameters['collection_name'])
         return_type, output = get_return_type(headers['accept'], parameters['output'])
+        if (parameters['limit'] or parameters['page_token']) and return_type != 'application/json':
+            raise RequestError(f'400: limit and page_token parameters are only supported for application/json '
+                               f'responses, not: {return_type}')
     except RequestError as e:
         error_code = int(str(e).split(':')[0])    # pylint: disable=use-maxsplit-arg
         logging.error(json.dumps({'http_code': error_code, 'error_message': str(e)}))
@@ -551,14 +776,20 @@ def lambda_handler(event, context):  # noqa: E501 # pylint: disable=W0613
         parameters['start_time'],
         parameters['end_time'],
         output,
-        parameters['fields']
+        parameters['fields'],
+        parameters['limit'],
+        parameters['exclusive_start_key'],
+        parameters['compact'] == 'true'
     )
+    if parameters['limit'] or parameters['page_token']:
+        last_evaluated_key = results.get('last_evaluated_key')
+        results['next_page_token'] = encode_page_token(last_evaluated_key, get_page_token_scope(parameters)) if last_evaluated_key else None
 
     end = time.time()
     elapsed = round((end - start) * 1000, 3)
 
     try:
-        data = get_response(results, hits, elapsed, return_type, output, parameters['compact'])
+        data = get_response(results, hits, elapsed, return_type, output)
     except RequestError as e:
         error_code = int(str(e).split(':')[0])    # pylint: disable=use-maxsplit-arg
         logging.error(json.dumps({'http_code': error_code, 'error_message': str(e)}))
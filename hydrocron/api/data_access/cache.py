@@ -0,0 +1,110 @@
+"""
+Response cache module
+"""
+
+from collections import OrderedDict
+import time
+
+
+class ResponseCache:
+    """
+    In-process LRU cache of timeseries responses bounded by total size and
+    entry age. Each entry records the ingest watermark of its collection when
+    it was stored and is treated as stale once a newer ingest_time has been
+    observed for that collection.
+
+    The watermark only advances when a query on the collection misses the
+    cache and reads a newer ingest_time, so a key that keeps hitting is not
+    invalidated by new ingests. Staleness is bounded by the TTL.
+    """
+
+    def __init__(self, max_size: int = 0, ttl: float = 0, clock=time.monotonic):
+        """
+        @param max_size: int - Cache budget in bytes, the cache is disabled when 0
+        @param ttl: float - Seconds an entry stays valid, the cache is disabled when 0
+        @param clock: callable - Returns the current time in seconds
+        """
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.size = 0
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._watermarks = {}
+
+    @property
+    def enabled(self):
+        """Return True when the cache stores entries."""
+
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, key: tuple, collection: tuple):
+        """
+        Return a cached value and mark it as most recently used.
+
+        @param key: tuple - Cache key
+        @param collection: tuple - Collection the value was read from
+        @return: the cached value or None when missing, expired or stale
+        """
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self._counters['misses'] += 1
+            return None
+
+        value, _, expires, watermark = entry
+        if expires <= self._clock() or watermark != self._watermarks.get(collection):
+            self._remove(key)
+            self._counters['invalidations'] += 1
+            self._counters['misses'] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._counters['hits'] += 1
+        return value
+
+    def put(self, key: tuple, collection: tuple, value, size: int):
+        """
+        Store a value, evicting least recently used entries to stay within
+        the size budget.
+
+        @param key: tuple - Cache key
+        @param collection: tuple - Collection the value was read from
+        @param value: Value to cache
+        @param size: int - Size of the value in bytes
+        """
+
+        if not self.enabled or size > self.max_size:
+            return
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (value, size, self._clock() + self.ttl, self._watermarks.get(collection))
+        self.size += size
+        while self.size > self.max_size:
+            self._remove(next(iter(self._entries)))
+            self._counters['evictions'] += 1
+
+    def observe_ingest_time(self, collection: tuple, ingest_time: str):
+        """
+        Advance the ingest watermark of a collection. Entries stored before
+        a newer ingest_time was observed are no longer returned.
+
+        @param collection: tuple - Collection the ingest_time was read from
+        @param ingest_time: str - Latest ingest_time of the query results
+        """
+
+        if ingest_time and ingest_time > self._watermarks.get(collection, ''):
+            self._watermarks[collection] = ingest_time
+
+    def stats(self):
+        """Return cache counters."""
+
+        return {**self._counters, 'entries': len(self._entries), 'size': self.size}
+
+    def _remove(self, key: tuple):
+        """Remove an entry and release its size."""
+
+        _, size, _, _ = self._entries.pop(key)
+        self.size -= size
@@ -2,24 +2,210 @@
 Database module
 """
 
+from concurrent.futures import ThreadPoolExecutor
+import datetime
 import logging
+import os
+import threading
 
 from boto3.resources.base import ServiceResource
-from boto3.dynamodb.conditions import Key, And  # noqa: E501 # pylint: disable=C0412
+from boto3.dynamodb.conditions import Key  # noqa: E501 # pylint: disable=C0412
+from botocore.exceptions import ClientError
 
 from hydrocron.utils import constants
 
 
+class PayloadTooLarge(Exception):
+    """
+    Exception thrown if query results exceed the response size budget
+    """
+
+
+class ResponseSizeEstimator:
+    """
+    Running estimate of the serialized size of query results. Shared between
+    concurrent segment queries so reads stop as soon as the budget is spent.
+    """
+
+    VALUE_OVERHEAD = 3    # Quotes and delimiter around each value
+    KEY_OVERHEAD = 3      # Quotes and separator around each attribute name
+
+    def __init__(self, max_size: int = None, keyed: bool = True):
+        """
+        @param max_size: int - Response budget in bytes, unbounded when omitted
+        @param keyed: bool - Whether attribute names are serialized with every item (JSON) or not (CSV)
+        """
+
+        self.max_size = max_size
+        self.keyed = keyed
+        self.size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def exceeded(self):
+        """Return True when the estimated size is over budget."""
+
+        return self.max_size is not None and self.size > self.max_size
+
+    def add(self, items: list):
+        """
+        Add the estimated size of items to the running total.
+
+        @param items: list - DynamoDB items
+        @return: True when the estimated size is over budget
+        """
+
+        size = sum(self.item_size(item) for item in items)
+        with self._lock:
+            self.size += size
+        return self.exceeded
+
+    def item_size(self, item: dict):
+        """
+        Estimate the serialized size of a single item.
+
+        @param item: dict - DynamoDB item
+        @return: int - estimated size in bytes
+        """
+
+        size = sum(len(str(value)) + self.VALUE_OVERHEAD for value in item.values())
+        if self.keyed:
+            size += sum(len(key) + self.KEY_OVERHEAD for key in item.keys())
+        return size
+
+
+class TableDescriptors:
+    """
+    Process-wide cache of Hydrocron table names and key schemas. Built once
+    from constants.TABLE_COLLECTION_INFO so requests do not describe tables;
+    a table is only described again after a ResourceNotFoundException.
+    """
+
+    def __init__(self, table_collection_info: list = None):
+        """
+        @param table_collection_info: list - Table definitions, constants.TABLE_COLLECTION_INFO when omitted
+        """
+
+        self._table_collection_info = table_collection_info
+        self._lock = threading.Lock()
+        self._features = None
+        self._key_schemas = {}
+
+    def get(self, collection_name: str, feature_type: str):
+        """
+        Return the table name and key schema for a collection and feature type.
+
+        @param collection_name: str - Parent collection name
+        @param feature_type: str - API feature type, case insensitive
+        @return: dict with table_name, partition_key and sort_key or None when there is no table
+        """
+
+        if self._features is None:
+            self._populate()
+        table_name = self._features.get((collection_name, feature_type.lower()))
+        if table_name is None:
+            return None
+        return {'table_name': table_name, **self._key_schemas[table_name]}
+
+    def key_schema(self, table_name: str):
+        """
+        Return the key schema of a table.
+
+        @param table_name: str - Hydrocron table name
+        @return: dict with partition_key and sort_key or None for unknown tables
+        """
+
+        if self._features is None:
+            self._populate()
+        return self._key_schemas.get(table_name)
+
+    def refresh(self, hydrocron_table):
+        """
+        Describe a table and update its cached key schema. Raises the
+        ResourceNotFoundException when the table does not exist.
+
+        @param hydrocron_table: Table - Table resource to describe
+        """
+
+        hydrocron_table.load()
+        keys = {key['KeyType']: key['AttributeName'] for key in hydrocron_table.key_schema}
+        if self._features is None:
+            self._populate()
+        with self._lock:
+            self._key_schemas[hydrocron_table.name] = {'partition_key': keys.get('HASH'), 'sort_key': keys.get('RANGE')}
+
+    def _populate(self):
+        """Index the table definitions by collection and feature type."""
+
+        table_collection_info = self._table_collection_info
+        if table_collection_info is None:
+            table_collection_info = constants.TABLE_COLLECTION_INFO
+        with self._lock:
+            if self._features is not None:
+                return
+            features = {}
+            for table_info in table_collection_info:
+                # The first definition wins, as when TABLE_COLLECTION_INFO was searched in order
+                features.setdefault((table_info['collection_name'], table_info['api_feature_type'].lower()), table_info['table_name'])
+                self._key_schemas.setdefault(table_info['table_name'], {'partition_key': table_info['partition_key'],
+                                                                        'sort_key': table_info['sort_key']})
+            self._features = features
+
+
+TABLE_DESCRIPTORS = TableDescriptors()
+
+
 class DynamoDataRepository:
     """
     Class Dynamo Data
     """
 
+    QUERY_SEGMENTS = int(os.getenv("QUERY_SEGMENTS")) if os.getenv("QUERY_SEGMENTS") else 1
+    QUERY_MAX_WORKERS = int(os.getenv("QUERY_MAX_WORKERS")) if os.getenv("QUERY_MAX_WORKERS") else 4
+
     def __init__(self, dynamo_resource: ServiceResource):
         self._dynamo_instance = dynamo_resource
         self._logger = logging.getLogger('hydrocron.api.data_access.db.DynamoDataRepository')
+        self._tables = threading.local()
+
+    def _get_table(self, table_name: str):
+        """
+        Return a table handle without describing the table. Handles are
+        created once per thread since table resources are not thread safe.
+
+        @param table_name: str - Hydrocron table name
+        @return: Table resource
+        """
+
+        tables = self._tables.__dict__
+        hydrocron_table = tables.get(table_name)
+        if hydrocron_table is None:
+            hydrocron_table = tables[table_name] = self._dynamo_instance.Table(table_name)
+        return hydrocron_table
+
+    def _retry_missing_table(self, table_name: str, query, *args, **kwargs):
+        """
+        Run a query and, if the table is not found, describe the table to
+        refresh its cached key schema and run the query once more.
 
-    def get_series_by_feature_id(self, collection_name: str, feature_type: str, feature_id: str, start_time: str, end_time: str):  # pylint: disable=too-many-positional-arguments
+        @param table_name: str - Hydrocron table the query reads
+        @param query: callable - Query to run
+        @return: the query result
+        """
+
+        try:
+            return query(*args, **kwargs)
+        except ClientError as error:
+            if error.response['Error']['Code'] != 'ResourceNotFoundException':
+                raise
+            self._logger.warning('Table %s was not found, refreshing its descriptor', table_name)
+            self._tables.__dict__.pop(table_name, None)
+            TABLE_DESCRIPTORS.refresh(self._get_table(table_name))
+            return query(*args, **kwargs)
+
+    def get_series_by_feature_id(self, collection_name: str, feature_type: str, feature_id: str,  # pylint: disable=too-many-positional-arguments,too-many-arguments,too-many-locals
+                                 start_time: str, end_time: str, attributes: list = None, size_estimator: ResponseSizeEstimator = None,
+                                 limit: int = None, exclusive_start_key: dict = None):
         """
 
         @param collection_name:
@@ -27,6 +213,10 @@ class DynamoDataRepository:
         @param feature_id:
         @param start_time:
         @param end_time:
+        @param attributes: list - Optional attribute names to project, all attributes are returned when omitted
+        @param size_estimator: ResponseSizeEstimator - Optional response budget, reads stop with PayloadTooLarge once exceeded
+        @param limit: int - Optional maximum number of items to return, LastEvaluatedKey is set when more items follow
+        @param exclusive_start_key: dict - Optional primary key of the last item returned by a previous page
         @return:
         """
 
@@ -40,56 +230,216 @@ class DynamoDataRepository:
 
         # Resolve sub-collection names (e.g. SWOT_L2_HR_RiverSP_reach_D) to their parent collection.
         parent_collection = constants.SHORTNAME.get(collection_name, collection_name)
-        for table_info in constants.TABLE_COLLECTION_INFO:
-            if (table_info['collection_name'] == parent_collection) and (table_info['api_feature_type'].lower() == feature_type.lower()):
-                table_name = table_info['table_name']
-                partition_key = table_info['partition_key']
-                sort_key = table_info['sort_key']
-                break
-        else:
+        table_descriptor = TABLE_DESCRIPTORS.get(parent_collection, feature_type)
+        if table_descriptor is None:
             return {'Items': []}
 
-        hydrocron_table = self._dynamo_instance.Table(table_name)
-        hydrocron_table.load()
+        return self._retry_missing_table(table_descriptor['table_name'], self._query_feature_series, table_descriptor['table_name'],
+                                         feature_id, start_time, end_time, attributes, size_estimator, limit, exclusive_start_key)
+
+    def _query_feature_series(self, table_name: str, feature_id: str,  # pylint: disable=too-many-positional-arguments,too-many-arguments,too-many-locals
+                              start_time: str, end_time: str, attributes: list, size_estimator: ResponseSizeEstimator, limit: int, exclusive_start_key: dict):
+        """
+        Query the series of a feature from the table using its cached key
+        schema. Arguments are those of get_series_by_feature_id.
+
+        @param table_name: str - Hydrocron table to query
+        @return: dictionary of items
+        """
+
+        key_schema = TABLE_DESCRIPTORS.key_schema(table_name)
+        partition_key = key_schema['partition_key']
+        sort_key = key_schema['sort_key']
+
+        hydrocron_table = self._get_table(table_name)
+        if attributes and limit:    # Key attributes are needed to resume after the last returned item
+            attributes = attributes + [partition_key, sort_key]
+        projection_args = self._get_projection_args(attributes) if attributes else {}
+        if size_estimator is None:
+            size_estimator = ResponseSizeEstimator()
+
+        time_segments = self._get_time_segments(start_time, end_time, self.QUERY_SEGMENTS)
+        if len(time_segments) > 1 and not limit and not exclusive_start_key:
+            return self._query_segments(table_name, partition_key, sort_key, feature_id, time_segments, projection_args, size_estimator)
+
         key_condition_expression = (
             Key(partition_key).eq(feature_id) &
             Key(sort_key).between(start_time, end_time)
         )
-        items = self._query_hydrocron_table(hydrocron_table, key_condition_expression)
+        query_args = {'KeyConditionExpression': key_condition_expression, **projection_args}
+        if exclusive_start_key:
+            query_args['ExclusiveStartKey'] = exclusive_start_key
+
+        # Read one item past the limit so LastEvaluatedKey is only returned when another page exists
+        pages = self._query_hydrocron_table(hydrocron_table, query_args, limit + 1 if limit else None)
+        items = self._read_pages(pages, size_estimator)
+        if limit and items['Count'] > limit:
+            items['Items'] = items['Items'][:limit]
+            items['Count'] = limit
+            items['LastEvaluatedKey'] = {key: items['Items'][-1][key] for key in (partition_key, sort_key)}
         return items
 
-    def _query_hydrocron_table(self, hydrocron_table: str, key_condition_expression: And):
+    def get_series_by_feature_ids(self, collection_name: str, feature_type: str, feature_ids: list,  # pylint: disable=too-many-positional-arguments,too-many-arguments
+                                  start_time: str, end_time: str, attributes: list = None, size_estimator: ResponseSizeEstimator = None):
         """
+        Query the series of several features concurrently.
 
-        @param hydrocron_table:
-        @param key_condition_expression:
-        @return:
+        @param collection_name:
+        @param feature_type:
+        @param feature_ids: list - Partition key values to query
+        @param start_time:
+        @param end_time:
+        @param attributes: list - Optional attribute names to project, all attributes are returned when omitted
+        @param size_estimator: ResponseSizeEstimator - Optional response budget shared by all features
+        @return: list of dictionary of items, one for each feature id in the order requested
         """
 
-        items = hydrocron_table.query(
-                KeyConditionExpression=key_condition_expression
-            )
-        last_key_evaluated = ''
-        if 'LastEvaluatedKey' in items.keys():
-            last_key_evaluated = items['LastEvaluatedKey']
+        if size_estimator is None:
+            size_estimator = ResponseSizeEstimator()
 
-        while last_key_evaluated:
-            next_items = hydrocron_table.query(
-                ExclusiveStartKey=last_key_evaluated,
-                KeyConditionExpression=key_condition_expression
+        def query_feature(feature_id):
+            return self.get_series_by_feature_id(collection_name, feature_type, feature_id, start_time, end_time,
+                                                 attributes, size_estimator)
+
+        max_workers = max(1, min(len(feature_ids), self.QUERY_MAX_WORKERS))
+        self._logger.info('Querying %s features with %s workers', len(feature_ids), max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(query_feature, feature_ids))
+
+    @staticmethod
+    def _get_time_segments(start_time: str, end_time: str, segments: int):
+        """
+        Split a sort key time range into contiguous sub-ranges of equal length.
+
+        Interior boundaries are formatted without a timezone designator. Sort
+        key values are always stored with a trailing "Z", so they sort after
+        the bare boundary string and fall into exactly one sub-range even
+        though BETWEEN is inclusive on both ends.
+
+        @param start_time: str - Start of the time range
+        @param end_time: str - End of the time range
+        @param segments: int - Number of sub-ranges to create
+        @return: list of (start, end) tuples, a single tuple if the range cannot be split
+        """
+
+        if segments <= 1:
+            return [(start_time, end_time)]
+        try:    # Sort keys compare as strings so split on the date and time text only
+            start = datetime.datetime.strptime(start_time[:19], "%Y-%m-%dT%H:%M:%S")
+            end = datetime.datetime.strptime(end_time[:19], "%Y-%m-%dT%H:%M:%S")
+        except ValueError:
+            return [(start_time, end_time)]
+
+        step = (end - start) / segments
+        if step < datetime.timedelta(seconds=1):
+            return [(start_time, end_time)]
+
+        boundaries = [(start + step * i).strftime("%Y-%m-%dT%H:%M:%S") for i in range(1, segments)]
+        return list(zip([start_time] + boundaries, boundaries + [end_time]))
+
+    def _query_segments(self, table_name: str, partition_key: str, sort_key: str, feature_id: str,  # pylint: disable=too-many-positional-arguments,too-many-arguments
+                        time_segments: list, projection_args: dict, size_estimator: ResponseSizeEstimator):
+        """
+        Query each time segment concurrently and merge the results in sort
+        key order.
+
+        @param table_name: str - Hydrocron table to query
+        @param partition_key: str - Name of the partition key
+        @param sort_key: str - Name of the sort key
+        @param feature_id: str - Partition key value to query
+        @param time_segments: list - (start, end) tuples in ascending order
+        @param projection_args: dict - ProjectionExpression query arguments
+        @param size_estimator: ResponseSizeEstimator - Response budget shared by all segments
+        @return: dictionary of items
+        """
+
+        def query_segment(time_segment):
+            hydrocron_table = self._get_table(table_name)
+            key_condition_expression = (
+                Key(partition_key).eq(feature_id) &
+                Key(sort_key).between(*time_segment)
             )
-            items['Items'].extend(next_items['Items'])
-            items['Count'] += next_items['Count']
-            items['ScannedCount'] += next_items['ScannedCount']
-            items['ResponseMetadata'] = next_items['ResponseMetadata']
-            last_key_evaluated = ''
-            if 'LastEvaluatedKey' in next_items.keys():
-                last_key_evaluated = next_items['LastEvaluatedKey']
-            else:
-                items.pop('LastEvaluatedKey')
+            pages = self._query_hydrocron_table(
+                hydrocron_table,
+                {'KeyConditionExpression': key_condition_expression, **projection_args}
+            )
+            return self._read_pages(pages, size_estimator)
+
+        max_workers = max(1, min(len(time_segments), self.QUERY_MAX_WORKERS))
+        self._logger.info('Querying %s time segments with %s workers', len(time_segments), max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            segment_items = list(executor.map(query_segment, time_segments))
+
+        items = {'Items': [], 'Count': 0, 'ScannedCount': 0}
+        for segment in segment_items:    # Segments are in ascending order so results remain sorted
+            items['Items'].extend(segment['Items'])
+            items['Count'] += segment['Count']
+            items['ScannedCount'] += segment['ScannedCount']
+            items['ResponseMetadata'] = segment['ResponseMetadata']
+        return items
 
+    @staticmethod
+    def _read_pages(pages, size_estimator: ResponseSizeEstimator):
+        """
+        Merge query result pages, stopping as soon as the response budget is
+        exceeded so no further pages are requested.
+
+        @param pages: iterator - Query result pages
+        @param size_estimator: ResponseSizeEstimator - Response budget
+        @return: dictionary of items
+        """
+
+        items = {'Items': [], 'Count': 0, 'ScannedCount': 0}
+        for page in pages:
+            items['Items'].extend(page['Items'])
+            items['Count'] += page['Count']
+            items['ScannedCount'] += page['ScannedCount']
+            items['ResponseMetadata'] = page['ResponseMetadata']
+            if size_estimator.add(page['Items']):
+                raise PayloadTooLarge(f'413: Query exceeds {size_estimator.max_size / 1048576:g}MB '
+                                      f'after reading {items["Count"]} hits')
         return items
 
+    @staticmethod
+    def _get_projection_args(attributes: list):
+        """
+        Build ProjectionExpression query arguments. Every attribute name is
+        substituted with a placeholder so that DynamoDB reserved words
+        (e.g. time) can be projected.
+
+        @param attributes: list - Attribute names to project
+        @return: dictionary of query arguments
+        """
+
+        attribute_names = {f'#p{i}': attribute for i, attribute in enumerate(dict.fromkeys(attributes))}
+        return {
+            'ProjectionExpression': ', '.join(attribute_names.keys()),
+            'ExpressionAttributeNames': attribute_names
+        }
+
+    def _query_hydrocron_table(self, hydrocron_table: str, query_args: dict, limit: int = None):
+        """
+        Iterate over query result pages, following LastEvaluatedKey. Pages are
+        only requested as the iterator is consumed.
+
+        @param hydrocron_table:
+        @param query_args: dict - Query arguments including the KeyConditionExpression
+        @param limit: int - Optional maximum number of items to read across all pages
+        @return: iterator of query result pages
+        """
+
+        query_args = dict(query_args)
+        while True:
+            if limit is not None:
+                query_args['Limit'] = limit
+            page = hydrocron_table.query(**query_args)
+            yield page
+            if limit is not None:
+                limit -= page['Count']
+            if 'LastEvaluatedKey' not in page or limit == 0:
+                return
+            query_args['ExclusiveStartKey'] = page['LastEvaluatedKey']
+
     def get_series_granule_ur(self, table_name, feature_name, granule_ur):
         """
 
@@ -98,9 +448,12 @@ class DynamoDataRepository:
         @return: dictionary of items
         """
 
-        hydrocron_table = self._dynamo_instance.Table(table_name)
-        hydrocron_table.load()
+        return self._retry_missing_table(table_name, self._query_series_granule_ur, table_name, feature_name, granule_ur)
 
+    def _query_series_granule_ur(self, table_name, feature_name, granule_ur):
+        """Query the feature identifiers of a granule, see get_series_granule_ur."""
+
+        hydrocron_table = self._get_table(table_name)
         items = hydrocron_table.query(
             ProjectionExpression=feature_name,
             IndexName="GranuleURIndex",
@@ -136,17 +489,33 @@ class DynamoDataRepository:
         @return: dictionary of items
         """
 
-        hydrocron_table = self._dynamo_instance.Table(table_name)
-        hydrocron_table.load()
-
-        items = hydrocron_table.query(
-            ProjectionExpression="granuleUR",
-            Limit=1,
-            IndexName="GranuleURIndex",
-            KeyConditionExpression=(
-                Key("granuleUR").eq(granule_ur)
+        return self._retry_missing_table(
+            table_name,
+            lambda: self._get_table(table_name).query(
+                ProjectionExpression="granuleUR",
+                Limit=1,
+                IndexName="GranuleURIndex",
+                KeyConditionExpression=(
+                    Key("granuleUR").eq(granule_ur)
+                )
             )
         )
+
+    def get_track_ingest_records(self, table_name, granule_ur):
+        """
+
+        @param table_name: str - Hydrocron track ingest table to query
+        @param granule_ur: str - Granule UR
+        @return: list of the track ingest records of each revision of the granule
+        """
+
+        hydrocron_table = self._get_table(table_name)
+        query_args = {"KeyConditionExpression": Key("granuleUR").eq(granule_ur)}
+        response = hydrocron_table.query(**query_args)
+        items = response["Items"]
+        while "LastEvaluatedKey" in response:
+            response = hydrocron_table.query(ExclusiveStartKey=response["LastEvaluatedKey"], **query_args)
+            items.extend(response["Items"])
         return items
 
     def get_status(self, table_name, status, limit=None):
@@ -157,7 +526,7 @@ class DynamoDataRepository:
         @param limit: str - Return items up to and including the limit
         """
 
-        hydrocron_table = self._dynamo_instance.Table(table_name)
+        hydrocron_table = self._get_table(table_name)
         items = hydrocron_table.query(
             IndexName="statusIndex",
             KeyConditionExpression=(Key("status").eq(status))
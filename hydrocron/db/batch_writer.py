@@ -0,0 +1,146 @@
+"""
+Parallel DynamoDB batch writer
+"""
+import itertools
+import json
+import logging
+import os
+import random
+import statistics
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class UnprocessedItems(Exception):
+    """
+    Exception thrown if items are still unprocessed after all retries
+    """
+
+    def __init__(self, message, stats):
+        super().__init__(message)
+        self.stats = stats
+
+
+class ParallelBatchWriter:  # pylint: disable=too-few-public-methods
+    """
+    Writes items to a DynamoDB table in BatchWriteItem requests of up to 25
+    items, dispatched over a thread pool. Unprocessed items are retried with
+    exponential backoff and full jitter.
+    """
+
+    MAX_BATCH_SIZE = 25
+    MAX_WORKERS = int(os.getenv("BATCH_WRITE_WORKERS")) if os.getenv("BATCH_WRITE_WORKERS") else 8
+    MAX_RETRIES = int(os.getenv("BATCH_WRITE_MAX_RETRIES")) if os.getenv("BATCH_WRITE_MAX_RETRIES") else 10
+
+    def __init__(self, client, table_name, max_workers=None, max_retries=None,  # pylint: disable=too-many-positional-arguments,too-many-arguments
+                 base_delay=0.05, max_delay=5.0, sleep=time.sleep):
+        """
+        Parameters
+        ----------
+        client : botocore.client.DynamoDB
+            DynamoDB client of a boto3 resource, items are serialized from Python types.
+        table_name : string
+            The name of the table.
+        max_workers : integer
+            Number of concurrent BatchWriteItem requests, BATCH_WRITE_WORKERS by default.
+        max_retries : integer
+            Number of times unprocessed items are retried, BATCH_WRITE_MAX_RETRIES by default.
+        base_delay : float
+            Backoff in seconds before the first retry, doubled on each retry.
+        max_delay : float
+            Upper bound of the backoff in seconds.
+        sleep : callable
+            Waits for a number of seconds.
+        """
+        self.client = client
+        self.table_name = table_name
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self.max_retries = self.MAX_RETRIES if max_retries is None else max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+
+    def write(self, items):
+        """
+        Writes items to the table and logs throughput statistics. Items are
+        consumed as batches are sent, so they can be generated lazily.
+
+        Parameters
+        ----------
+        items : iterable
+            The items to put in the table.
+
+        Returns
+        -------
+        dict
+            Counts of items written, items still unprocessed after all
+            retries and throttled requests, with batch latency and throughput.
+        """
+        items = iter(items)
+        results = []
+        pending = deque()
+        item_count = 0
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for batch in iter(lambda: list(itertools.islice(items, self.MAX_BATCH_SIZE)), []):
+                # Bound the batches waiting for a worker so items are only built ahead of the writes
+                if len(pending) >= 2 * self.max_workers:
+                    results.append(pending.popleft().result())
+                pending.append(executor.submit(self._write_batch, batch))
+                item_count += len(batch)
+            results.extend(future.result() for future in pending)
+        elapsed = time.perf_counter() - start
+
+        latencies = [result['latency'] * 1000 for result in results] or [0]
+        stats = {
+            'items': item_count,
+            'batches': len(results),
+            'workers': max(1, min(len(results), self.max_workers)),
+            'written': sum(result['written'] for result in results),
+            'unprocessed': sum(result['unprocessed'] for result in results),
+            'throttled': sum(result['throttled'] for result in results),
+            'seconds': round(elapsed, 3),
+            'items_per_second': round(item_count / elapsed, 1) if elapsed else 0,
+            'batch_latency_ms': {
+                'median': round(statistics.median(latencies), 1),
+                'max': round(max(latencies), 1)
+            }
+        }
+        logger.info("Batch write to %s: %s", self.table_name, json.dumps(stats))
+        return stats
+
+    def _write_batch(self, batch):
+        """
+        Writes one batch, retrying unprocessed items until they are written
+        or the retries are exhausted.
+
+        Parameters
+        ----------
+        batch : list
+            Up to 25 items.
+
+        Returns
+        -------
+        dict
+            Counts for the batch and its latency in seconds.
+        """
+        requests = [{'PutRequest': {'Item': item}} for item in batch]
+        throttled = 0
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            response = self.client.batch_write_item(RequestItems={self.table_name: requests})
+            requests = response.get('UnprocessedItems', {}).get(self.table_name, [])
+            if not requests:
+                break
+            throttled += 1
+            if attempt < self.max_retries:
+                self._sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+        latency = time.perf_counter() - start
+
+        logger.debug("Batch of %s items written in %.1f ms with %s throttled requests",
+                     len(batch), latency * 1000, throttled)
+        return {'written': len(batch) - len(requests), 'unprocessed': len(requests), 'throttled': throttled, 'latency': latency}
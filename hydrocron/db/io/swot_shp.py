@@ -1,8 +1,9 @@
 """
 Unpacks SWOT Shapefiles
 """
+import io
+import itertools
 import os.path
-import tempfile
 from datetime import datetime, timezone
 from importlib import resources
 import xml.etree.ElementTree as ET
@@ -12,15 +13,26 @@ import logging
 import geopandas as gpd
 import numpy as np
 import pandas as pd
+import pyogrio
 from shapely import Polygon
 
 from hydrocron.utils import constants
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:    # pyarrow is not a dependency, the Arrow reader is only available where it is installed
+    pa = None
+
 
 logging.getLogger().setLevel(logging.INFO)
 
+# 'geopandas' reads with geopandas.read_file, 'arrow' opts in to reading through
+# pyogrio's Arrow interface and falls back to geopandas when pyarrow is not installed
+SHAPEFILE_READER = os.getenv('SHAPEFILE_READER', 'geopandas')
+
 
-def read_shapefile(filepath, obscure_data, columns, s3_resource=None):
+def read_shapefile(filepath, obscure_data, columns, s3_resource=None, fields=None):  # pylint: disable=too-many-positional-arguments,too-many-arguments
     """
     Reads a SWOT shapefile packaged as a zip
 
@@ -35,6 +47,9 @@ def read_shapefile(filepath, obscure_data, columns, s3_resource=None):
         The shapefile attributes to obscure if obscure_data=True
     s3_resource : the s3 granule object to open
         Optional - the s3 object to open
+    fields : list
+        Optional - the shapefile attributes to read, all attributes
+        are read when omitted
 
     Returns
     -------
@@ -44,32 +59,114 @@ def read_shapefile(filepath, obscure_data, columns, s3_resource=None):
     """
     filename = os.path.basename(filepath)
 
-    with tempfile.TemporaryDirectory() as lambda_temp_dir_name:
-        lambda_temp_file = os.path.join(lambda_temp_dir_name, filename)
-        if filepath.startswith('s3'):
-            bucket_name, key = filepath.replace("s3://", "").split("/", 1)
-            logging.info("Opening granule %s from bucket %s", key, bucket_name)
+    # Open the shapefile and its metadata from one in-memory copy of the granule.
+    # pyogrio serves the bytes from GDAL's /vsimem/ and reads the zip through /vsizip/
+    granule = read_granule(filepath, s3_resource)
+    # Obscured values are computed on numeric columns so they are read as numbers
+    use_arrow = SHAPEFILE_READER == 'arrow' and pa is not None and not obscure_data
+    shp_file = read_granule_layer(granule, fields, use_arrow)
+    attributes = read_granule_attributes(filepath, granule)
 
-            s3_resource.Bucket(bucket_name).download_file(key, lambda_temp_file, ExtraArgs={"RequestPayer": "requester"})
+    return transform_layer(shp_file, filename, obscure_data, columns, attributes)
 
-            shp_file = gpd.read_file('zip://' + lambda_temp_file)
-            with zipfile.ZipFile(lambda_temp_file) as archive:
-                shp_xml_tree = ET.fromstring(archive.read(filename[:-4] + ".shp.xml"))
 
-        elif filepath.startswith('https'):
-            _, bucket_name, key = filepath.replace("https://", "").split("/", 2)
-            logging.info("Opening granule %s from bucket %s", key, bucket_name)
+def read_shapefile_chunks(filepath, obscure_data, columns, s3_resource=None, fields=None, chunk_size=10000):  # pylint: disable=too-many-positional-arguments,too-many-arguments
+    """
+    Reads a SWOT shapefile packaged as a zip in chunks of features so only
+    one chunk of items is held in memory at a time. The Arrow reader also
+    decodes one chunk at a time, the geopandas reader decodes the whole layer
 
-            s3_resource.Bucket(bucket_name).download_file(key, lambda_temp_file, ExtraArgs={"RequestPayer": "requester"})
+    Parameters
+    ----------
+    filepath :  string
+        The full path to the file to read
+    obscure_data : boolean
+        If true, obscure the data values to avoid exposing real data.
+        Used during beta testing.
+    columns : list
+        The shapefile attributes to obscure if obscure_data=True
+    s3_resource : the s3 granule object to open
+        Optional - the s3 object to open
+    fields : list
+        Optional - the shapefile attributes to read, all attributes
+        are read when omitted
+    chunk_size : integer
+        The number of features in each chunk
 
-            shp_file = gpd.read_file('zip://' + lambda_temp_file)
-            with zipfile.ZipFile(lambda_temp_file) as archive:
-                shp_xml_tree = ET.fromstring(archive.read(filename[:-4] + ".shp.xml"))
-        else:
-            shp_file = gpd.read_file('zip://' + filepath)
-            with zipfile.ZipFile(filepath) as archive:
-                shp_xml_tree = ET.fromstring(archive.read(filename[:-4] + ".shp.xml"))
+    Returns
+    -------
+    feature_count : integer
+        The number of features in the shapefile
+    chunks : iterator
+        Lists of item dictionaries, decoded as the iterator is consumed
+    """
+    filename = os.path.basename(filepath)
+
+    granule = read_granule(filepath, s3_resource)
+    use_arrow = SHAPEFILE_READER == 'arrow' and pa is not None and not obscure_data
+    attributes = read_granule_attributes(filepath, granule)
+    feature_count = pyogrio.read_info(io.BytesIO(granule))['features']
+
+    def read_chunks():
+        for shp_file in iter_granule_layer(granule, fields, use_arrow, chunk_size):
+            yield transform_layer(shp_file, filename, obscure_data, columns, attributes)
+
+    return feature_count, read_chunks()
+
+
+def read_granule_attributes(filepath, granule):
+    """
+    Reads the attributes shared by every feature of a granule from its
+    filename and its shp.xml metadata
+
+    Parameters
+    ----------
+    filepath :  string
+        The full path of the granule
+    granule : bytes
+        The content of the granule zip file
+
+    Returns
+    -------
+    attributes : dict
+        The filename and metadata attributes
+    """
+    filename = os.path.basename(filepath)
+    with zipfile.ZipFile(io.BytesIO(granule)) as archive:
+        shp_xml_tree = ET.fromstring(archive.read(filename[:-4] + ".shp.xml"))
+
+    filename_attrs = parse_from_filename(filepath)
 
+    xml_attrs = parse_metadata_from_shpxml(shp_xml_tree)
+
+    return filename_attrs | xml_attrs
+
+
+def transform_layer(shp_file, filename, obscure_data, columns, attributes):
+    """
+    Converts shapefile features into items: prior lake polygons are
+    replaced by their centerpoints, values are obscured if requested
+    and the granule attributes are added
+
+    Parameters
+    ----------
+    shp_file : geopandas.GeoDataFrame
+        The shapefile features
+    filename : string
+        The granule filename
+    obscure_data : boolean
+        If true, obscure the data values to avoid exposing real data.
+    columns : list
+        The shapefile attributes to obscure if obscure_data=True
+    attributes : dict
+        The granule attributes to add to each item
+
+    Returns
+    -------
+    items : list
+        A list containing json dictionaries of each item attributes to add
+        to the database table
+    """
     if 'LakeSP_Prior' in filename:
         shp_file = handle_null_geometries(shp_file)
         shp_file = convert_polygon_to_centerpoint(shp_file)
@@ -84,14 +181,160 @@ def read_shapefile(filepath, obscure_data, columns, s3_resource=None):
             np.random.default_rng().integers(low=2, high=10)*shp_file[numeric_columns],
             shp_file[numeric_columns])
 
-    filename_attrs = parse_from_filename(filepath)
+    return assemble_attributes(shp_file, attributes)
 
-    xml_attrs = parse_metadata_from_shpxml(shp_xml_tree)
 
-    attributes = filename_attrs | xml_attrs
-    items = assemble_attributes(shp_file, attributes)
+def read_granule(filepath, s3_resource=None):
+    """
+    Reads a granule into memory from S3 or the local file system
 
-    return items
+    Parameters
+    ----------
+    filepath :  string
+        The s3:// or https:// uri or the local path of the granule
+    s3_resource : the s3 resource used to read the granule object
+        Optional - required for s3:// and https:// uris
+
+    Returns
+    -------
+    granule : bytes
+        The content of the granule zip file
+    """
+    if filepath.startswith('s3'):
+        bucket_name, key = filepath.replace("s3://", "").split("/", 1)
+    elif filepath.startswith('https'):
+        _, bucket_name, key = filepath.replace("https://", "").split("/", 2)
+    else:
+        with open(filepath, 'rb') as granule_file:
+            return granule_file.read()
+
+    logging.info("Opening granule %s from bucket %s", key, bucket_name)
+    response = s3_resource.Object(bucket_name, key).get(RequestPayer="requester")
+    return response['Body'].read()
+
+
+def read_granule_layer(granule, fields=None, use_arrow=False):
+    """
+    Reads the shapefile layer of an in-memory granule zip
+
+    The Arrow reader decodes the layer into Arrow columns and converts
+    every attribute to the same string that astype(str) produces, so
+    assemble_attributes only has to convert the geometry.
+
+    Parameters
+    ----------
+    granule : bytes
+        The content of the granule zip file
+    fields : list
+        Optional - the shapefile attributes to read, all attributes
+        are read when omitted
+    use_arrow : boolean
+        Read through pyogrio's Arrow interface, requires pyarrow
+
+    Returns
+    -------
+    geodf : geopandas.GeoDataFrame
+        the shapefile features, with string attributes when read through Arrow
+    """
+    if not use_arrow:
+        return gpd.read_file(io.BytesIO(granule), columns=fields)
+
+    meta, table = pyogrio.read_arrow(io.BytesIO(granule), columns=fields)
+    return arrow_table_to_geodataframe(meta, table)
+
+
+def iter_granule_layer(granule, fields=None, use_arrow=False, chunk_size=10000):
+    """
+    Reads the shapefile layer of an in-memory granule zip in chunks
+
+    The Arrow reader decodes one record batch at a time. geopandas can only
+    read a range of features by opening the granule again, which copies it
+    into GDAL's memory filesystem for every chunk, so the layer is read once
+    and split into chunks instead.
+
+    Parameters
+    ----------
+    granule : bytes
+        The content of the granule zip file
+    fields : list
+        Optional - the shapefile attributes to read, all attributes
+        are read when omitted
+    use_arrow : boolean
+        Read Arrow record batches, requires pyarrow
+    chunk_size : integer
+        The number of features in each chunk
+
+    Returns
+    -------
+    chunks : iterator of geopandas.GeoDataFrame
+        the shapefile features, with string attributes when read through Arrow
+    """
+    if use_arrow:
+        with pyogrio.open_arrow(io.BytesIO(granule), columns=fields, batch_size=chunk_size, use_pyarrow=True) as (meta, reader):
+            for batch in reader:
+                yield arrow_table_to_geodataframe(meta, pa.Table.from_batches([batch]))
+        return
+
+    shp_file = gpd.read_file(io.BytesIO(granule), columns=fields)
+    for start in range(0, len(shp_file), chunk_size):
+        yield shp_file.iloc[start:start + chunk_size]
+
+
+def arrow_table_to_geodataframe(meta, table):
+    """
+    Converts a layer read through pyogrio's Arrow interface to a
+    GeoDataFrame with string attributes
+
+    Parameters
+    ----------
+    meta : dict
+        pyogrio layer metadata
+    table : pyarrow.Table
+        the attributes and WKB geometries of the features
+
+    Returns
+    -------
+    geodf : geopandas.GeoDataFrame
+        the features with string attributes
+    """
+    geometry_name = meta['geometry_name'] or 'wkb_geometry'
+    columns = {
+        name: arrow_column_to_str(table[name])
+        for name in table.column_names if name != geometry_name
+    }
+    geometry = gpd.GeoSeries.from_wkb(table[geometry_name].to_numpy(zero_copy_only=False), crs=meta['crs'])
+    return gpd.GeoDataFrame(columns, geometry=geometry)
+
+
+def arrow_column_to_str(column):
+    """
+    Converts an Arrow column to a numpy array of strings matching astype(str)
+
+    Integer and string columns are cast with Arrow compute. Arrow formats
+    floats differently from Python (e.g. 1 rather than 1.0), so floats use
+    Python's shortest repr instead. Missing values are NaN and integer
+    columns with missing values are formatted as floats, as geopandas
+    reads them.
+
+    Parameters
+    ----------
+    column : pyarrow.ChunkedArray
+        the column to convert
+
+    Returns
+    -------
+    values : numpy.ndarray
+        object array of strings, missing values are NaN
+    """
+    if pa.types.is_integer(column.type) and column.null_count:
+        column = pc.cast(column, pa.float64())
+
+    if pa.types.is_floating(column.type):
+        values = np.array([repr(value) for value in column.to_pylist()], dtype=object)
+    else:
+        values = np.array(pc.cast(column, pa.string()).to_numpy(zero_copy_only=False), dtype=object)
+    values[column.is_null(nan_is_null=True).to_numpy(zero_copy_only=False)] = np.nan
+    return values
 
 
 def handle_null_geometries(geodf):
@@ -195,15 +438,69 @@ def assemble_attributes(geodf, attributes):
     """
     logging.info('Starting assemble attributes')
 
-    items = []
-
-    geodf = geodf.astype(str)
-    geodf = geodf.assign(**attributes)
-    items = geodf.to_dict('records')
+    items = list(iter_items(geodf, attributes))
 
     return items
 
 
+def iter_items(geodf, attributes):
+    """
+    Generates the item of each record column by column: each column is
+    formatted as strings at once and the file attributes are shared by
+    every item instead of being copied into a column
+
+    Parameters
+    ----------
+    geodf : geodataframe
+        The file records as a geodataframe
+
+    attributes : dict
+        A dictionary of attributes to concatenate, replacing any
+        record attribute with the same name
+
+    Returns
+    -------
+    items : iterator of dict
+        The items, created as the iterator is consumed
+    """
+    names = list(geodf.columns)
+    columns = [format_column(geodf[name]) for name in names]
+    for name, value in attributes.items():
+        if name in names:
+            columns[names.index(name)] = itertools.repeat(value, len(geodf))
+        else:
+            names.append(name)
+            columns.append(itertools.repeat(value, len(geodf)))
+
+    for values in zip(*columns):
+        yield dict(zip(names, values))
+
+
+def format_column(column):
+    """
+    Formats a column as the strings astype(str) produces, with numeric
+    columns formatted by numpy instead of one str call per value
+
+    Parameters
+    ----------
+    column : pandas.Series
+        The column to format
+
+    Returns
+    -------
+    values : list
+        The formatted values, missing values are kept as NaN
+    """
+    if not isinstance(column.dtype, np.dtype) or column.dtype.kind not in 'biuf':
+        return column.astype(str).tolist()
+
+    values = column.to_numpy()
+    strings = values.astype(str).astype(object)
+    if values.dtype.kind == 'f':
+        strings[np.isnan(values)] = np.nan
+    return strings.tolist()
+
+
 def parse_from_filename(filepath):
     """
     Parses the cycle, pass, start and end time from
@@ -0,0 +1,182 @@
+"""
+DynamoDB item size calculation and oversized item policies
+"""
+from decimal import Decimal
+import os
+import re
+
+from boto3.dynamodb.types import Binary
+
+MAX_ITEM_SIZE = 400 * 1024
+CONTAINER_OVERHEAD = 3    # Bytes added to every map and list
+ELEMENT_OVERHEAD = 1      # Bytes added to every map or list element
+
+
+def item_size(item):
+    """
+    Calculates the stored size of an item following DynamoDB's item size
+    rules: the UTF-8 length of every attribute name plus its value size.
+
+    Parameters
+    ----------
+    item : dict
+        Item attributes as Python types accepted by boto3.
+
+    Returns
+    -------
+    integer
+        Size of the item in bytes.
+    """
+    return sum(len(name.encode('utf-8')) + attribute_size(value) for name, value in item.items())
+
+
+def attribute_size(value):
+    """
+    Calculates the stored size of an attribute value.
+
+    Strings are their UTF-8 length and binary values their byte length.
+    Numbers take one byte per two significant digits plus one byte. Null
+    and boolean values take one byte. Lists and maps take three bytes plus
+    one byte and the size of each element, including the names in a map.
+    Sets are the sum of their elements.
+
+    Parameters
+    ----------
+    value : object
+        Attribute value as a Python type accepted by boto3.
+
+    Returns
+    -------
+    integer
+        Size of the value in bytes.
+    """
+    if isinstance(value, str):
+        size = len(value.encode('utf-8'))
+    elif value is None or isinstance(value, bool):
+        size = 1
+    elif isinstance(value, (int, float, Decimal)):
+        size = _number_size(value)
+    elif isinstance(value, (bytes, bytearray)):
+        size = len(value)
+    elif isinstance(value, Binary):
+        size = len(value.value)
+    elif isinstance(value, dict):
+        size = CONTAINER_OVERHEAD + sum(len(name.encode('utf-8')) + attribute_size(element) + ELEMENT_OVERHEAD
+                                        for name, element in value.items())
+    elif isinstance(value, (list, tuple)):
+        size = CONTAINER_OVERHEAD + sum(attribute_size(element) + ELEMENT_OVERHEAD for element in value)
+    elif isinstance(value, (set, frozenset)):
+        size = sum(attribute_size(element) for element in value)
+    else:
+        raise TypeError(f"Unsupported DynamoDB attribute type: {type(value).__name__}")
+    return size
+
+
+def _number_size(value):
+    """Size of a number from its significant digits, leading and trailing zeros are not stored."""
+    digits = Decimal(str(value)).normalize().as_tuple().digits
+    significant = len(digits) if any(digits) else 1
+    return (significant + 1) // 2 + 1
+
+
+def skip(item, max_size):  # pylint: disable=unused-argument
+    """
+    Oversized item policy that drops the item.
+
+    Returns
+    -------
+    None
+    """
+    return None
+
+
+def truncate_geometry(item, max_size):
+    """
+    Oversized item policy that reduces the number of decimals written for
+    each coordinate of the WKT geometry, down to two decimals, until the
+    item fits.
+
+    Parameters
+    ----------
+    item : dict
+        The oversized item.
+    max_size : integer
+        Maximum item size in bytes.
+
+    Returns
+    -------
+    dict
+        The item with a shortened geometry or None when it does not fit.
+    """
+    geometry = item.get('geometry')
+    if not isinstance(geometry, str):
+        return None
+
+    for decimals in range(6, 1, -1):
+        truncated = {**item, 'geometry': re.sub(rf'(\d\.\d{{{decimals}}})\d+', r'\1', geometry)}
+        if item_size(truncated) <= max_size:
+            return truncated
+    return None
+
+
+def simplify_geometry(item, max_size):
+    """
+    Oversized item policy that simplifies the WKT geometry with an
+    increasing tolerance, in degrees, until the item fits.
+
+    Parameters
+    ----------
+    item : dict
+        The oversized item.
+    max_size : integer
+        Maximum item size in bytes.
+
+    Returns
+    -------
+    dict
+        The item with a simplified geometry or None when it does not fit.
+    """
+    geometry = item.get('geometry')
+    if not isinstance(geometry, str):
+        return None
+
+    from shapely import wkt  # pylint: disable=import-outside-toplevel
+    shape = wkt.loads(geometry)
+    for tolerance in (1e-6, 1e-5, 1e-4, 1e-3):
+        simplified = {**item, 'geometry': shape.simplify(tolerance, preserve_topology=True).wkt}
+        if item_size(simplified) <= max_size:
+            return simplified
+    return None
+
+
+OVERSIZE_POLICIES = {
+    'skip': skip,
+    'truncate_geometry': truncate_geometry,
+    'simplify_geometry': simplify_geometry
+}
+
+
+def get_oversize_policy(name=None):
+    """
+    Returns an oversized item policy by name.
+
+    Parameters
+    ----------
+    name : string or callable
+        One of skip, truncate_geometry or simplify_geometry, the
+        OVERSIZE_ITEM_POLICY environment variable or skip when omitted.
+        A callable is returned as the policy.
+
+    Returns
+    -------
+    callable
+        Policy called with an oversized item and the maximum item size that
+        returns the item to write or None to drop it.
+    """
+    if callable(name):
+        return name
+    name = name or os.getenv('OVERSIZE_ITEM_POLICY') or 'skip'
+    try:
+        return OVERSIZE_POLICIES[name]
+    except KeyError as err:
+        raise ValueError(f"Unknown oversized item policy '{name}', expected one of {', '.join(OVERSIZE_POLICIES)}") from err
@@ -5,18 +5,27 @@ the appropriate DynamoDB table
 import logging
 import os
 import json
+import resource
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-import boto3
 import earthaccess
 from botocore.exceptions import ClientError
 
+from hydrocron.api.data_access.db import DynamoDataRepository
 from hydrocron.db import HydrocronTable
+from hydrocron.db.batch_writer import ParallelBatchWriter
 from hydrocron.db.io import swot_shp
 from hydrocron.utils import connection
 from hydrocron.utils import constants
 
 logging.getLogger().setLevel(logging.INFO)
 
+# Chunks bound the items held in memory, decoding is only bounded by the opt-in Arrow shapefile reader
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE")) if os.getenv("INGEST_CHUNK_SIZE") else 0
+GRANULE_BATCH_SIZE = int(os.getenv("GRANULE_BATCH_SIZE")) if os.getenv("GRANULE_BATCH_SIZE") else 1
+GRANULE_WORKERS = int(os.getenv("GRANULE_WORKERS")) if os.getenv("GRANULE_WORKERS") else 4
+
 
 class MissingTable(Exception):
     """
@@ -41,6 +50,7 @@ def lambda_handler(event, _):  # noqa: E501 # pylint: disable=W0613
     start_date = event['body']['start_date']
     end_date = event['body']['end_date']
     load_benchmarking_data = event['body']['load_benchmarking_data']
+    force = event['body'].get('force', "False")
 
     for table_info in constants.TABLE_COLLECTION_INFO:
         if table_info['table_name'] in table_name:
@@ -58,8 +68,7 @@ def lambda_handler(event, _):  # noqa: E501 # pylint: disable=W0613
         start_date,
         end_date)
 
-    lambda_client = boto3.client('lambda')
-
+    granules = []
     for granule in new_granules:
         granule_path = granule.data_links(access='direct')[0]
         logging.info('Granule: %s', granule_path)
@@ -76,37 +85,99 @@ def lambda_handler(event, _):  # noqa: E501 # pylint: disable=W0613
             logging.info('No UMM revision date')
 
         if feature_type in granule_path:
-            event2 = ('{"body": {"granule_path": "' + granule_path
-                      + '","table_name": "' + table_name
-                      + '","track_table": "' + track_table
-                      + '","checksum": "' + checksum
-                      + '","revisionDate": "' + revision_date
-                      + '","load_benchmarking_data": "' + load_benchmarking_data + '"}}')
-
-            logging.info("Invoking granule load lambda with event json %s", str(event2))
+            granules.append({
+                "granule_path": granule_path,
+                "table_name": table_name,
+                "track_table": track_table,
+                "checksum": checksum,
+                "revisionDate": revision_date,
+                "load_benchmarking_data": load_benchmarking_data,
+                "force": force
+            })
 
-            lambda_client.invoke(
-                FunctionName=os.environ['GRANULE_LAMBDA_FUNCTION_NAME'],
-                InvocationType='Event',
-                Payload=event2)
+    invoke_granule_loads(connection.lambda_client, granules)
 
 
 def granule_handler(event, _):
     """
-    Second Lambda entrypoint for loading individual granules
+    Second Lambda entrypoint for loading individual granules, or a batch
+    of granules listed under "granules" loaded concurrently
     """
-    granule_path = event['body']['granule_path']
+    granules = event['body'].get('granules')
+    if granules is None:
+        load_granule(event['body'])
+    else:
+        load_granules(granules)
 
-    load_benchmarking_data = event['body']['load_benchmarking_data']
+
+def load_granules(granules, max_workers=None):
+    """
+    Load a batch of granules concurrently, sharing the process connections.
+    When only some granules fail, the granule load lambda is invoked again
+    with just the failed granules, so a retry does not rewrite the granules
+    that were loaded.
+
+    Parameters
+    ----------
+    granules : list
+        The granule load request of each granule
+    max_workers : integer
+        The number of granules loaded at once, GRANULE_WORKERS by default
+
+    Raises
+    ------
+    The first error raised loading a granule when every granule failed, so
+    the invocation is retried with the same batch
+    """
+    max_workers = max(1, min(len(granules), max_workers or GRANULE_WORKERS))
+    logging.info("Loading %s granules with %s workers", len(granules), max_workers)
+    if max_workers * ParallelBatchWriter.MAX_WORKERS > connection.config.max_pool_connections:
+        logging.warning("%s granule workers with %s batch writers each exceed the %s pooled connections set by AWS_MAX_POOL_CONNECTIONS",
+                        max_workers, ParallelBatchWriter.MAX_WORKERS, connection.config.max_pool_connections)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(load_granule, granule) for granule in granules]
+
+    failed = []
+    errors = []
+    for granule, future in zip(granules, futures):
+        if future.exception() is not None:
+            logging.error("Failed to load granule %s: %s", granule['granule_path'], future.exception())
+            failed.append(granule)
+            errors.append(future.exception())
+
+    logging.info("Loaded %s of %s granules", len(granules) - len(failed), len(granules))
+    if not failed:
+        return
+    if len(failed) < len(granules):
+        logging.info("Retrying %s failed granules in a new invocation", len(failed))
+        invoke_granule_loads(connection.lambda_client, failed, batch_size=len(failed))
+        return
+    raise errors[0]
+
+
+def load_granule(request):  # pylint: disable=too-many-statements
+    """
+    Load one granule into its table and record it in the track ingest table
+
+    Parameters
+    ----------
+    request : dict
+        The granule load request: granule_path, load_benchmarking_data and
+        optionally checksum, revisionDate and force to load a granule the
+        track ingest table shows is already ingested with the same checksum
+    """
+    granule_path = request['granule_path']
+
+    load_benchmarking_data = request['load_benchmarking_data']
 
     try:
-        checksum = event['body']['checksum']
+        checksum = request['checksum']
     except KeyError:
         checksum = "Not Found"
         logging.info('No CNM checksum')
 
     try:
-        revision_date = event['body']['revisionDate']
+        revision_date = request['revisionDate']
     except KeyError:
         revision_date = "Not Found"
         logging.info('No CNM revision date')
@@ -127,35 +198,90 @@ def granule_handler(event, _):
 
     logging.info("Value of load_benchmarking_data is: %s", load_benchmarking_data)
 
+    force = "true" in str(request.get('force', "False")).lower()
+    if load_benchmarking_data != "True" and not force and granule_unchanged(
+            DynamoDataRepository(connection.dynamodb_resource), track_table, os.path.basename(granule_path), checksum):
+        logging.info("Skipping granule %s, already ingested with checksum %s. Set force to reload it.",
+                     os.path.basename(granule_path), checksum)
+        return
+
     obscure_data = "true" in os.getenv("OBSCURE_DATA").lower()
     logging.info("Value of obscure_data is: %s", obscure_data)
 
-    if load_benchmarking_data == "True":
-        logging.info("Loading benchmarking data")
-        items = swot_shp.load_benchmarking_data()
-    else:
-        logging.info("Setting up S3 connection")
-        s3_resource = connection.s3_resource
+    with MemorySampler() as memory:
+        chunks = None
+        if load_benchmarking_data == "True":
+            logging.info("Loading benchmarking data")
+            items = swot_shp.load_benchmarking_data()
+            feature_count = len(items)
+        else:
+            logging.info("Setting up S3 connection")
+            s3_resource = connection.s3_resource
+
+            if INGEST_CHUNK_SIZE > 0:
+                logging.info("Starting streaming read of granule in chunks of %s features", INGEST_CHUNK_SIZE)
+                feature_count, chunks = read_data_chunks(granule_path, obscure_data, s3_resource, INGEST_CHUNK_SIZE)
+            else:
+                logging.info("Starting read granule")
+                items = read_data(granule_path, obscure_data, s3_resource)
+                feature_count = len(items)
+
+        logging.info("Set up dynamo connection")
+        dynamo_resource = connection.dynamodb_resource
+
+        logging.info("Adding granule to track ingest table")
+        track_ingest_record = [{
+            "granuleUR": os.path.basename(granule_path),
+            "revision_date": revision_date,
+            "expected_feature_count": feature_count,
+            "actual_feature_count": 0,
+            "checksum": checksum,
+            "status": "to_ingest"
+            }]
+        load_data(dynamo_resource, table_name=track_table, items=track_ingest_record)
+
+        logging.info("Begin loading data from granule: %s", os.path.basename(granule_path))
+        if chunks is None:
+            load_data(dynamo_resource, table_name, items)
+        else:
+            load_data_chunks(dynamo_resource, table_name, chunks)
+
+    memory.log(os.path.basename(granule_path))
+
+
+def granule_unchanged(data_repository, track_table, granule_ur, checksum):
+    """
+    Check the track ingest table for an ingested revision of the granule
+    with the same checksum, where every expected feature was loaded
 
-        logging.info("Starting read granule")
-        items = read_data(granule_path, obscure_data, s3_resource)
+    Parameters
+    ----------
+    data_repository : DynamoDataRepository
+    track_table : string
+        The track ingest table of the granule
+    granule_ur : string
+        The granule UR
+    checksum : string
+        The checksum of the granule to load
 
-    logging.info("Set up dynamo connection")
-    dynamo_resource = connection.dynamodb_resource
+    Returns
+    -------
+    unchanged : True if the granule does not need to be loaded again
+    """
+    if checksum == "Not Found":
+        return False
 
-    logging.info("Adding granule to track ingest table")
-    track_ingest_record = [{
-        "granuleUR": os.path.basename(granule_path),
-        "revision_date": revision_date,
-        "expected_feature_count": len(items),
-        "actual_feature_count": 0,
-        "checksum": checksum,
-        "status": "to_ingest"
-        }]
-    load_data(dynamo_resource, table_name=track_table, items=track_ingest_record)
+    try:
+        records = data_repository.get_track_ingest_records(track_table, granule_ur)
+    except ClientError as err:
+        logging.warning("Could not check track ingest table %s for granule %s: %s", track_table, granule_ur, err)
+        return False
 
-    logging.info("Begin loading data from granule: %s", os.path.basename(granule_path))
-    load_data(dynamo_resource, table_name, items)
+    for record in records:
+        if record.get('checksum') == checksum and record.get('status') != "to_ingest" \
+                and int(record.get('actual_feature_count', -1)) == int(record.get('expected_feature_count', -1)):
+            return True
+    return False
 
 
 def cnm_handler(event, _):
@@ -164,9 +290,8 @@ def cnm_handler(event, _):
     """
     load_benchmarking_data = "False"
 
-    lambda_client = boto3.client('lambda')
-
     # Parse message
+    granules = []
     for message in event['Records']:
         cnm = json.loads(message['Sns']['Message'])
         revision_date = cnm['submissionTime']
@@ -186,19 +311,52 @@ def cnm_handler(event, _):
                 else:
                     raise MissingTable(f"Error: Cannot load granule: {granule_uri}")
 
-                event2 = ('{"body": {"granule_path": "' + granule_uri
-                          + '","table_name": "' + table_name
-                          + '","track_table": "' + track_table
-                          + '","checksum": "' + checksum
-                          + '","revisionDate": "' + revision_date
-                          + '","load_benchmarking_data": "' + load_benchmarking_data + '"}}')
+                granules.append({
+                    "granule_path": granule_uri,
+                    "table_name": table_name,
+                    "track_table": track_table,
+                    "checksum": checksum,
+                    "revisionDate": revision_date,
+                    "load_benchmarking_data": load_benchmarking_data
+                })
+
+    invoke_granule_loads(connection.lambda_client, granules)
 
-                logging.info("Invoking granule load lambda with event json %s", str(event2))
 
-                lambda_client.invoke(
-                    FunctionName=os.environ['GRANULE_LAMBDA_FUNCTION_NAME'],
-                    InvocationType='Event',
-                    Payload=event2)
+def invoke_granule_loads(lambda_client, granules, batch_size=None):
+    """
+    Invoke the granule load lambda asynchronously with batches of granules.
+    A batch of one granule is sent as a single granule event.
+
+    Parameters
+    ----------
+    lambda_client : Lambda client
+    granules : list
+        The granule load request of each granule
+    batch_size : integer
+        The number of granules per invocation, GRANULE_BATCH_SIZE by default
+
+    Returns
+    -------
+    invocations : the number of invocations
+    """
+    batch_size = max(1, batch_size or GRANULE_BATCH_SIZE)
+    invocations = 0
+    for start in range(0, len(granules), batch_size):
+        batch = granules[start:start + batch_size]
+        body = batch[0] if len(batch) == 1 else {"granules": batch}
+        payload = json.dumps({"body": body})
+
+        logging.info("Invoking granule load lambda with event json %s", payload)
+
+        lambda_client.invoke(
+            FunctionName=os.environ['GRANULE_LAMBDA_FUNCTION_NAME'],
+            InvocationType='Event',
+            Payload=payload)
+        invocations += 1
+
+    logging.info("Invoked granule load lambda %s times for %s granules", invocations, len(granules))
+    return invocations
 
 
 def find_new_granules(collection_shortname, start_date, end_date):
@@ -281,6 +439,40 @@ def read_data(granule_path, obscure_data, s3_resource=None):
     return items
 
 
+def read_data_chunks(granule_path, obscure_data, s3_resource=None, chunk_size=10000):
+    """
+    Read data from shapefiles in chunks of features
+
+    Parameters
+    ----------
+    granule_path : string
+        the S3 url to the granule to unpack
+    obscure_data : boolean
+        whether to obscure the data on load
+    s3_resource : boto3 session resource
+    chunk_size : integer
+        the number of features in each chunk
+
+    Returns
+    -------
+    feature_count : the number of features in the granule
+    chunks : iterator of lists of items, read as it is consumed
+    """
+    for feature_type, columns in (('Reach', constants.REACH_DATA_COLUMNS),
+                                  ('Node', constants.NODE_DATA_COLUMNS),
+                                  ('LakeSP_Prior', constants.PRIOR_LAKE_DATA_COLUMNS)):
+        if feature_type in granule_path:
+            logging.info("Start reading %s shapefile in chunks", feature_type)
+            return swot_shp.read_shapefile_chunks(
+                granule_path,
+                obscure_data,
+                columns,
+                s3_resource=s3_resource,
+                chunk_size=chunk_size)
+
+    return 0, iter([])
+
+
 def load_data(dynamo_resource, table_name, items):
     """
     Load data into dynamo DB
@@ -297,7 +489,7 @@ def load_data(dynamo_resource, table_name, items):
 
     try:
         logging.info("Set up dynamo table connection")
-        hydrocron_table = HydrocronTable(dyn_resource=dynamo_resource, table_name=table_name)
+        hydrocron_table = HydrocronTable.get(dynamo_resource, table_name)
     except ClientError as err:
         if err.response['Error']['Code'] == 'ResourceNotFoundException':
             raise MissingTable(f"Hydrocron table '{table_name}' does not exist.") from err
@@ -315,6 +507,45 @@ def load_data(dynamo_resource, table_name, items):
     else:
         raise MissingTable(f'Items cannot be parsed, file reader not implemented for table {hydrocron_table.table_name}')
 
+    try:
+        write_items(hydrocron_table, items, feature_name, feature_id)
+    except ClientError as err:
+        if err.response['Error']['Code'] != 'ResourceNotFoundException':
+            raise err
+        # The registered table was not described, confirm it exists before retrying
+        logging.warning("Table %s was not found, describing it before retrying", table_name)
+        HydrocronTable.evict(table_name)
+        try:
+            hydrocron_table = HydrocronTable.get(dynamo_resource, table_name, describe=True)
+        except ClientError as describe_err:
+            if describe_err.response['Error']['Code'] == 'ResourceNotFoundException':
+                raise MissingTable(f"Hydrocron table '{table_name}' does not exist.") from describe_err
+            raise describe_err
+        write_items(hydrocron_table, items, feature_name, feature_id)
+
+
+def write_items(hydrocron_table, items, feature_name, feature_id):
+    """
+    Write items to a Hydrocron table
+
+    Parameters
+    ----------
+    hydrocron_table : HydrocronTable
+        The table to write to
+    items : list
+        The items to write
+    feature_name : String
+        Feature name used in log messages
+    feature_id : String
+        Attribute logged for each item
+
+    Raises
+    ------
+    UnprocessedItems
+        When items are still unprocessed after the batch writer's retries,
+        so the granule load fails and is retried
+    """
+
     if len(items) > 5:
         logging.info("Batch adding %s %s items. First 5 feature ids in batch: ", len(items), feature_name)
         for i in range(5):
@@ -330,3 +561,112 @@ def load_data(dynamo_resource, table_name, items):
             hydrocron_table.add_data(**item_attrs)
 
         logging.info("Finished loading %s items", len(items))
+
+
+def load_data_chunks(dynamo_resource, table_name, chunks):
+    """
+    Load chunks of items into dynamo DB, writing each chunk while the
+    next one is read so at most two chunks are held in memory
+
+    Parameters
+    ----------
+    dynamo_resource : Resource
+        Dynamo resource
+    table_name : String
+        The name of the table
+    chunks : iterator
+        Lists of items to load
+
+    Returns
+    -------
+    item_count : the number of items loaded
+    """
+    item_count = 0
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = None
+        for chunk in chunks:
+            if pending is not None:
+                pending.result()
+            pending = executor.submit(load_data, dynamo_resource, table_name, chunk)
+            item_count += len(chunk)
+        if pending is not None:
+            pending.result()
+
+    logging.info("Finished loading %s items in chunks", item_count)
+    return item_count
+
+
+def resident_memory_mb():
+    """
+    Returns the current resident memory of the process in megabytes, or the
+    peak resident memory where /proc is not available
+    """
+    try:
+        with open('/proc/self/statm', encoding='utf-8') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class MemorySampler:
+    """
+    Samples the resident memory of the process in a background thread to
+    find the peak while a granule is loaded, rather than reading the peak
+    of the process lifetime which a warm container has often already passed.
+
+    Memory is measured for the whole process, so when granule_handler loads
+    GRANULE_WORKERS granules at once the peak includes the other loads in
+    flight. The number of concurrent loads is logged with the peak.
+    """
+
+    _active = 0
+    _active_lock = threading.Lock()
+
+    def __init__(self, interval=0.05):
+        """
+        Parameters
+        ----------
+        interval : float
+            Seconds between samples
+        """
+        self.interval = interval
+        self.before = self.peak = 0.0
+        self.concurrent = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def __enter__(self):
+        with MemorySampler._active_lock:
+            MemorySampler._active += 1
+        self.before = self.peak = resident_memory_mb()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, resident_memory_mb())
+        with MemorySampler._active_lock:
+            MemorySampler._active -= 1
+
+    def _sample(self):
+        """
+        Records the peak resident memory until the sampler is stopped
+        """
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, resident_memory_mb())
+            with MemorySampler._active_lock:
+                self.concurrent = max(self.concurrent, MemorySampler._active)
+
+    def log(self, granule_name):
+        """
+        Logs the peak resident memory while a granule was loaded and how
+        much it increased over the memory in use when the load started
+
+        Parameters
+        ----------
+        granule_name : String
+            The name of the granule
+        """
+        logging.info("Peak memory loading granule %s: %.1f MB, increased by %.1f MB, %s granule loads in flight",
+                     granule_name, self.peak, self.peak - self.before, max(1, self.concurrent))
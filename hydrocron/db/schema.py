@@ -2,10 +2,14 @@
 Hydrocron Table module
 """
 import logging
-import sys
+import threading
 from botocore.exceptions import ClientError
 from boto3.dynamodb.conditions import Key
 
+from hydrocron.db.batch_writer import ParallelBatchWriter, UnprocessedItems
+from hydrocron.db.item_size import MAX_ITEM_SIZE, get_oversize_policy, item_size
+from hydrocron.utils import constants
+
 logger = logging.getLogger(__name__)
 
 
@@ -14,8 +18,11 @@ class HydrocronTable:
     Class representing a Hydrocron DynamoDB table
     """
 
+    _registry = {}
+    _registry_lock = threading.Lock()
+
     def __init__(self, dyn_resource,
-                 table_name):
+                 table_name, key_schema=None):
         """
         Parameters
         -----------
@@ -23,14 +30,17 @@ class HydrocronTable:
             A Boto3 DynamoDB resource.
         table_name : string
             The name of the table.
+        key_schema : tuple, optional
+            Partition and sort key names. The table is not described
+            when they are given.
         """
         self.dyn_resource = dyn_resource
         self.table_name = table_name
 
-        if self.exists(table_name):
+        if key_schema:
             self.table = self.dyn_resource.Table(table_name)
-            self.table.load()
-
+            self.partition_key_name, self.sort_key_name = key_schema
+        elif self.exists(table_name):
             self.partition_key_name = self.table.key_schema[0]['AttributeName']
             self.sort_key_name = self.table.key_schema[1]['AttributeName']
         else:
@@ -38,6 +48,81 @@ class HydrocronTable:
                 "Table %s does not exist",
                 table_name)
 
+    @classmethod
+    def get(cls, dyn_resource, table_name, describe=False):
+        """
+        Returns a table from the process-wide registry. Tables listed in
+        constants.TABLE_COLLECTION_INFO are constructed from their known
+        key schema, other tables are described once.
+
+        Parameters
+        ----------
+        dyn_resource : boto3.session.resource('dynamodb')
+            A Boto3 DynamoDB resource.
+        table_name : string
+            The name of the table.
+        describe : boolean
+            Describe the table even if it is registered, e.g. after a
+            ResourceNotFoundException.
+
+        Returns
+        -------
+        HydrocronTable
+            The registered table.
+
+        Raises
+        ------
+        ClientError
+            When a described table does not exist.
+        """
+        with cls._registry_lock:
+            hydrocron_table = cls._registry.get(table_name)
+            if describe or hydrocron_table is None or hydrocron_table.dyn_resource is not dyn_resource:
+                key_schema = None if describe else cls.get_key_schema(table_name)
+                if key_schema is None:
+                    table = dyn_resource.Table(table_name)
+                    table.load()
+                    keys = {key['KeyType']: key['AttributeName'] for key in table.key_schema}
+                    key_schema = (keys['HASH'], keys['RANGE'])
+                hydrocron_table = cls(dyn_resource, table_name, key_schema)
+                cls._registry[table_name] = hydrocron_table
+        return hydrocron_table
+
+    @classmethod
+    def evict(cls, table_name):
+        """
+        Removes a table from the registry so it is described on next use.
+
+        Parameters
+        ----------
+        table_name : string
+            The name of the table.
+        """
+        with cls._registry_lock:
+            cls._registry.pop(table_name, None)
+
+    @staticmethod
+    def get_key_schema(table_name):
+        """
+        Looks up the key schema of a table in constants.TABLE_COLLECTION_INFO.
+
+        Parameters
+        ----------
+        table_name : string
+            The name of the table.
+
+        Returns
+        -------
+        tuple
+            Partition and sort key names or None when the table is not listed.
+        """
+        for table_info in constants.TABLE_COLLECTION_INFO:
+            if table_info['table_name'] == table_name:
+                return table_info['partition_key'], table_info['sort_key']
+            if table_info['track_table'] == table_name:
+                return constants.TRACK_INGEST_PARTITION_KEY, constants.TRACK_INGEST_SORT_KEY
+        return None
+
     def exists(self, table_name):
         """
         Determines whether a table exists.
@@ -97,37 +182,88 @@ class HydrocronTable:
                 err.response['Error']['Message'])
             raise
 
-    def batch_fill_table(self, items):
+    def batch_fill_table(self, items, oversize_policy=None, max_workers=None):
         """
-        Fills the DynamoDB table with the specified data, using the Boto3
-        Table.batch_writer() function to put the items in the table.
-        Inside the context manager, Table.batch_writer builds a list of
-        requests. On exiting the context manager, Table.batch_writer starts sending
-        batches of write requests to Amazon DynamoDB and automatically
-        handles chunking, buffering, and retrying.
+        Fills the DynamoDB table with the specified data. Items are split
+        into BatchWriteItem requests of 25 items that are sent concurrently
+        by a ParallelBatchWriter, which retries unprocessed items with
+        jittered backoff and logs throughput statistics. Items over the
+        DynamoDB item size limit are passed to the oversized item policy.
 
         Parameters
         ----------
            items : The data to put in the table.
+           oversize_policy : Name of an oversized item policy or a callable
+               taking the item and maximum size, OVERSIZE_ITEM_POLICY by default.
+           max_workers : Number of concurrent BatchWriteItem requests,
+               BATCH_WRITE_WORKERS by default.
+
+        Returns
+        -------
+        dict
+            Batch write statistics, None when the write failed.
+
+        Raises
+        ------
+        UnprocessedItems
+            When items are still unprocessed after all retries.
         """
         table = self.table
+        oversize_policy = get_oversize_policy(oversize_policy)
 
         try:
-            with table.batch_writer() as writer:
-                for item in items:
-                    if sys.getsizeof(item) < 300000:
-                        writer.put_item(Item=item)
-                    else:
-                        logger.Warning(
-                            "Item too large, could not load: %s %s",
-                            self.partition_key_name,
-                            item[self.partition_key_name]
-                        )
-                        continue
+            stats = ParallelBatchWriter(table.meta.client, table.name, max_workers=max_workers).write(self._writable_items(items, oversize_policy))
+            if stats['unprocessed']:
+                logger.error("Couldn't load %s unprocessed items into table %s.", stats['unprocessed'], table.name)
+                raise UnprocessedItems(f"{stats['unprocessed']} items were not written to table {table.name}", stats)
             logger.info("Loaded data into table %s.", table.name)
+            return stats
 
-        except ClientError:
+        except ClientError as err:
+            if err.response['Error']['Code'] == 'ResourceNotFoundException':
+                raise
             logger.exception("Couldn't load data into table %s.", table.name)
+            return None
+
+    def _writable_items(self, items, oversize_policy):
+        """
+        Generates the items to write as the writer consumes them, passing
+        items over the DynamoDB item size limit to the oversized item policy.
+
+        Parameters
+        ----------
+           items : The data to put in the table.
+           oversize_policy : Callable taking the item and maximum size.
+
+        Returns
+        -------
+        iterator
+            The items that fit in the table.
+        """
+        for item in items:
+            size = item_size(item)
+            if size <= MAX_ITEM_SIZE:
+                yield item
+                continue
+
+            writable_item = oversize_policy(item, MAX_ITEM_SIZE)
+            if writable_item is None:
+                logger.warning(
+                    "Item too large (%s bytes), could not load: %s %s",
+                    size,
+                    self.partition_key_name,
+                    item[self.partition_key_name]
+                )
+            else:
+                logger.warning(
+                    "Item too large (%s bytes), loading %s bytes after %s: %s %s",
+                    size,
+                    item_size(writable_item),
+                    oversize_policy.__name__,
+                    self.partition_key_name,
+                    item[self.partition_key_name]
+                )
+                yield writable_item
 
     def run_query(self, partition_key, sort_key=None):
         """
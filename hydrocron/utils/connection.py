@@ -4,6 +4,8 @@ Hydrocron Connection class.
 
 # Standard imports
 import os
+import threading
+import time
 from types import ModuleType
 import sys
 
@@ -12,11 +14,20 @@ import boto3
 from boto3.resources.base import ServiceResource
 import botocore
 from botocore.client import BaseClient
+from botocore.config import Config
 
 
-class Connection(ModuleType):
+class Connection(ModuleType):  # pylint: disable=too-many-instance-attributes
     """
     Hydrocron connection class for handling AWS service resources.
+
+    All resources and clients are created from one shared boto3 session with
+    the same botocore configuration, and are created once per process.
+
+    The DynamoDB endpoint is resolved on first use rather than at import. In
+    prod it is read from SSM unless HYDROCRON_dynamodb_endpoint_url is set,
+    and is cached for the process lifetime or for DYNAMODB_ENDPOINT_TTL
+    seconds when that is set.
     """
 
     APP_NAME = 'hydrocron'
@@ -25,79 +36,135 @@ class Connection(ModuleType):
     def __init__(self, name):
         super().__init__(name)
         self.env = os.getenv('HYDROCRON_ENV', 'prod')
+        self._lock = threading.RLock()
+        self._session = None
+        self._config = None
         self._dynamodb_resource = None
-        self._dynamodb_endpoint = self._get_dynamodb_endpoint()
         self._s3_resource = None
         self._ssm_client = None
         self._sns_client = None
+        self._lambda_client = None
+        self._dynamodb_endpoint = None
+        self._dynamodb_endpoint_expires = None
 
     def _get_dynamodb_endpoint(self):
-        """Return dynamodb endpoint URL."""
+        """Return dynamodb endpoint URL.
+
+        The environment variable takes precedence over SSM in every
+        environment, an empty value selects the default regional endpoint."""
 
-        if self.env == "prod":
-            ssm = boto3.client('ssm')
+        endpoint_variable = f"{self.APP_NAME.upper()}_dynamodb_endpoint_url"
+        if self.env == "prod" and endpoint_variable not in os.environ:
             try:
-                endpoint = ssm.get_parameter(Name=f"{Connection.SSM_PATH}dynamodb_endpoint_url")
+                parameter = self.ssm_client.get_parameter(Name=f"{Connection.SSM_PATH}dynamodb_endpoint_url")
+                endpoint = parameter["Parameter"]["Value"]
             except botocore.exceptions.ClientError as error:
                 if error.response["Error"]["Code"] == "ParameterNotFound":
                     endpoint = None
                 else:
                     raise error
         else:
-            endpoint = os.getenv(f"{self.APP_NAME.upper()}_dynamodb_endpoint_url", None)
+            endpoint = os.getenv(endpoint_variable, None)
+
+        return endpoint or None
+
+    @property
+    def dynamodb_endpoint(self):
+        """Return the DynamoDB endpoint URL, resolving it on first use and
+        again once DYNAMODB_ENDPOINT_TTL seconds have passed. The DynamoDB
+        resource is recreated when a refresh returns a different endpoint."""
+
+        with self._lock:
+            now = time.monotonic()
+            if self._dynamodb_endpoint_expires is None or now >= self._dynamodb_endpoint_expires:
+                endpoint = self._get_dynamodb_endpoint()
+                if self._dynamodb_endpoint_expires is not None and endpoint != self._dynamodb_endpoint:
+                    self._dynamodb_resource = None
+                self._dynamodb_endpoint = endpoint
+                ttl = float(os.getenv('DYNAMODB_ENDPOINT_TTL', '0'))
+                self._dynamodb_endpoint_expires = now + ttl if ttl > 0 else float('inf')
+        return self._dynamodb_endpoint
+
+    @property
+    def session(self) -> boto3.session.Session:
+        """Return the boto3 session shared by all resources and clients."""
 
-        return endpoint
+        with self._lock:
+            if not self._session:
+                self._session = boto3.session.Session()
+        return self._session
+
+    @property
+    def config(self) -> Config:
+        """Return the botocore configuration applied to all resources and
+        clients. The connection pool is sized for concurrent queries and
+        writes."""
+
+        if not self._config:
+            self._config = Config(
+                max_pool_connections=int(os.getenv('AWS_MAX_POOL_CONNECTIONS', '50')),
+                connect_timeout=float(os.getenv('AWS_CONNECT_TIMEOUT', '5')),
+                read_timeout=float(os.getenv('AWS_READ_TIMEOUT', '30')),
+                retries={'mode': 'adaptive', 'max_attempts': int(os.getenv('AWS_MAX_ATTEMPTS', '5'))},
+                tcp_keepalive=True
+            )
+        return self._config
 
     @property
     def dynamodb_resource(self) -> ServiceResource:
         """Return DynamoDB session resource."""
 
-        session = boto3.session.Session()
-        if not self._dynamodb_resource:
-            if self._dynamodb_endpoint:
-                self._dynamodb_resource = session.resource('dynamodb', endpoint_url=self._dynamodb_endpoint)
-            else:
-                self._dynamodb_resource = session.resource('dynamodb')
+        with self._lock:
+            endpoint = self.dynamodb_endpoint
+            if not self._dynamodb_resource:
+                if endpoint:
+                    self._dynamodb_resource = self.session.resource('dynamodb', endpoint_url=endpoint, config=self.config)
+                else:
+                    self._dynamodb_resource = self.session.resource('dynamodb', config=self.config)
         return self._dynamodb_resource
 
     @property
     def s3_resource(self) -> ServiceResource:
         """Return S3 session resource."""
 
-        if not self._s3_resource:
-
-            s3_session = boto3.session.Session()
-
-            self._s3_resource = s3_session.resource('s3')
-
+        with self._lock:
+            if not self._s3_resource:
+                self._s3_resource = self.session.resource('s3', config=self.config)
         return self._s3_resource
 
     @property
     def ssm_client(self) -> BaseClient:
         """Return SSM client."""
 
-        if not self._ssm_client:
-
-            ssm_session = boto3.session.Session()
-            self._ssm_client = ssm_session.client('ssm')
-
+        with self._lock:
+            if not self._ssm_client:
+                self._ssm_client = self.session.client('ssm', config=self.config)
         return self._ssm_client
 
     @property
     def sns_client(self) -> BaseClient:
         """Return SNS client."""
 
-        if not self._sns_client:
+        with self._lock:
+            if not self._sns_client:
+                self._sns_client = self.session.client('sns', config=self.config)
+        return self._sns_client
 
-            sns_session = boto3.session.Session()
-            self._sns_client = sns_session.client('sns')
+    @property
+    def lambda_client(self) -> BaseClient:
+        """Return Lambda client."""
 
-        return self._sns_client
+        with self._lock:
+            if not self._lambda_client:
+                self._lambda_client = self.session.client('lambda', config=self.config)
+        return self._lambda_client
 
 
 dynamodb_resource: ServiceResource
 s3_resource: ServiceResource
 ssm_client: BaseClient
 sns_client: BaseClient
+lambda_client: BaseClient
+config: Config
 
 sys.modules[__name__] = Connection(__name__)
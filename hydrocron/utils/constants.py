@@ -150,6 +150,8 @@ SWOT_PRIOR_LAKE_PARTITION_KEY = "lake_id"
 SWOT_REACH_SORT_KEY = "range_start_time"
 SWOT_NODE_SORT_KEY = "range_start_time"
 SWOT_PRIOR_LAKE_SORT_KEY = "range_start_time"
+TRACK_INGEST_PARTITION_KEY = "granuleUR"
+TRACK_INGEST_SORT_KEY = "revision_date"
 
 TABLE_COLLECTION_INFO = [
     {'collection_name': 'SWOT_L2_HR_RiverSP_2.0',
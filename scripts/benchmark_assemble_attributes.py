@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Compare item assembly with astype(str) and to_dict against column-wise assembly.
+
+Times turning the decoded reach and node test granules in tests/data into
+items, and checks both give the same items. Run from the repository root
+in the poetry environment:
+
+    poetry run python scripts/benchmark_assemble_attributes.py --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import logging
+import math
+import os
+import statistics
+import time
+
+from hydrocron.db.io import swot_shp
+
+ATTRIBUTES = {"granuleUR": "benchmark", "collection_shortname": "benchmark", "ingest_time": "benchmark"}
+
+
+def to_dict_items(layer, attributes: dict) -> list:
+    """Assemble items by stringifying the whole frame and converting each row."""
+    return layer.astype(str).assign(**attributes).to_dict("records")
+
+
+def column_items(layer, attributes: dict) -> list:
+    """Assemble items column by column."""
+    return list(swot_shp.iter_items(layer, attributes))
+
+
+def same_items(items: list, other: list) -> bool:
+    """Compare items attribute by attribute, with missing values equal."""
+    def normalize(value):
+        return "<nan>" if isinstance(value, float) and math.isnan(value) else (type(value), value)
+
+    return len(items) == len(other) and all(
+        list(item) == list(other_item) and all(normalize(item[name]) == normalize(other_item[name]) for name in item)
+        for item, other_item in zip(items, other)
+    )
+
+
+def benchmark(assemble, layer, repeat: int) -> list[float]:
+    """Return the wall time in milliseconds of each run."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        assemble(layer, ATTRIBUTES)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs per assembly")
+    parser.add_argument("--data", default=os.path.join("tests", "data"), help="directory of granule zips")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    paths = [path for path in sorted(glob.glob(os.path.join(args.data, "*.zip")))
+             if "Reach" in path or "Node" in path]
+    if not paths:
+        raise SystemExit(f"No reach or node granules in {args.data}")
+
+    print(f"repeat={args.repeat}")
+    for path in paths:
+        with open(path, "rb") as granule_file:
+            layer = swot_shp.read_granule_layer(granule_file.read())
+        if not same_items(column_items(layer, ATTRIBUTES), to_dict_items(layer, ATTRIBUTES)):
+            raise SystemExit(f"Items differ for {path}")
+
+        print(f"{os.path.basename(path)}: {len(layer)} items, {len(layer.columns) + len(ATTRIBUTES)} attributes")
+        for name, assemble in (("to_dict", to_dict_items), ("column-wise", column_items)):
+            timings = benchmark(assemble, layer, args.repeat)
+            print(f"{name:>12}: median {statistics.median(timings):8.2f} ms  min {min(timings):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
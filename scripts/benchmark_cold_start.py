@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Measure timeseries Lambda cold start import time and first request latency.
+
+Each run starts a fresh interpreter, imports the handler module and times a
+heartbeat request, a request rejected by validation, and the first CSV and
+GeoJSON responses built from the benchmarking reach data. Run from the
+repository root in the poetry environment:
+
+    poetry run python scripts/benchmark_cold_start.py --repeat 10
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import csv, json, sys, time
+from importlib import resources
+
+start = time.perf_counter()
+from hydrocron.api.controllers import timeseries
+timings = {"import": time.perf_counter() - start}
+
+headers = {"User-Agent": "Elastic-Heartbeat/7.0", "X-Forwarded-For": "127.0.0.1"}
+start = time.perf_counter()
+timeseries.lambda_handler({"body": {}, "headers": headers}, None)
+timings["heartbeat"] = time.perf_counter() - start
+
+body = {"feature": "Reach", "feature_id": "xx", "start_time": "2024-01-01T00:00:00Z",
+        "end_time": "2024-12-31T00:00:00Z", "fields": "reach_id,time_str,wse"}
+start = time.perf_counter()
+try:
+    timeseries.lambda_handler({"body": body, "headers": {**headers, "User-Agent": "curl"}}, None)
+except timeseries.RequestError:
+    pass
+timings["validation_error"] = time.perf_counter() - start
+
+with resources.as_file(resources.files("hydrocron.db").joinpath("benchmarking_data_reaches.csv")) as path:
+    with open(path, encoding="utf-8-sig") as csv_file:
+        items = list(csv.DictReader(csv_file))
+for item in items:
+    item["geometry"] = "LINESTRING (-95.5 29.7, -95.49 29.71, -95.48 29.72)"
+
+start = time.perf_counter()
+timeseries.format_csv(items, "reach_id,time_str,wse")
+timings["first_csv"] = time.perf_counter() - start
+start = time.perf_counter()
+timeseries.format_json(items, "reach_id,time_str,wse")
+timings["first_geojson"] = time.perf_counter() - start
+
+timings = {name: seconds * 1000 for name, seconds in timings.items()}
+timings["heavy_modules"] = [module for module in ("numpy", "pandas", "geopandas", "shapely") if module in sys.modules]
+print(json.dumps(timings))
+"""
+
+
+def run_once() -> dict:
+    """Run the cold start measurements in a fresh interpreter."""
+    env = {
+        "DEFAULT_RIVER_COLLECTION": "SWOT_L2_HR_RiverSP",
+        "DEFAULT_LAKE_COLLECTION": "SWOT_L2_HR_LakeSP",
+        "DEFAULT_COLLECTION_VERSION": "D",
+        "HYDROCRON_ENV": "local",   # No AWS access is needed
+        "AWS_DEFAULT_REGION": "us-west-2",
+        **os.environ
+    }
+    result = subprocess.run([sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="number of fresh interpreters to measure")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.repeat)]
+    print(f"repeat={args.repeat}, heavy modules loaded: {', '.join(runs[-1]['heavy_modules']) or 'none'}")
+    for name in ("import", "heartbeat", "validation_error", "first_csv", "first_geojson"):
+        timings = [run[name] for run in runs]
+        print(f"{name:>16}: median {statistics.median(timings):8.2f} ms  max {max(timings):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Compare the direct GeoJSON builder with the GeoDataFrame.to_json path.
+
+Uses the benchmarking reach time series shipped with hydrocron.db. Run from
+the repository root in the poetry environment:
+
+    poetry run python scripts/benchmark_geojson.py --repeat 20
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("DEFAULT_RIVER_COLLECTION", "SWOT_L2_HR_RiverSP")
+os.environ.setdefault("DEFAULT_LAKE_COLLECTION", "SWOT_L2_HR_LakeSP")
+os.environ.setdefault("DEFAULT_COLLECTION_VERSION", "D")
+os.environ.setdefault("HYDROCRON_ENV", "local")   # No AWS access is needed to format responses
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))   # The reference lives with the tests
+
+from hydrocron.api.controllers import timeseries  # noqa: E402
+from hydrocron.db.io import swot_shp  # noqa: E402
+from tests.dataframe_reference import format_json_dataframe  # noqa: E402
+
+FIELDS = "reach_id,time_str,wse,slope,width,geometry"
+
+
+def format_json_direct(items: list, fields: str) -> dict:
+    """GeoJSON response built directly from the query items."""
+    data, _ = timeseries.format_json(items, fields)
+    return data["response"]
+
+
+def benchmark(function, items: list, repeat: int) -> list[float]:
+    """Return the wall time in milliseconds of each run, including the final serialization."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        json.dumps(function(items, FIELDS))
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10, help="number of timed runs per implementation")
+    args = parser.parse_args()
+
+    items = swot_shp.load_benchmarking_data()
+    if format_json_dataframe(items, FIELDS) != format_json_direct(items, FIELDS):
+        raise SystemExit("GeoJSON responses differ")
+
+    print(f"{len(items)} items, fields={FIELDS}, repeat={args.repeat}")
+    for name, function in (("dataframe", format_json_dataframe), ("direct", format_json_direct)):
+        timings = benchmark(function, items, args.repeat)
+        print(f"{name:>10}: median {statistics.median(timings):8.2f} ms  min {min(timings):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Compare the geopandas and Arrow shapefile readers on the test granules.
+
+Times decoding each granule zip in tests/data and assembling its items,
+and checks both readers produce the same items. Run from the repository
+root in the poetry environment with pyarrow installed:
+
+    poetry run python scripts/benchmark_shapefile_reader.py --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import logging
+import os
+import statistics
+import time
+
+from hydrocron.db.io import swot_shp
+
+ATTRIBUTES = {"granuleUR": "benchmark"}
+
+
+def read_items(granule: bytes, use_arrow: bool, fields: list | None) -> list:
+    """Decode a granule and assemble its items with one reader."""
+    layer = swot_shp.read_granule_layer(granule, fields, use_arrow)
+    return swot_shp.assemble_attributes(layer, ATTRIBUTES)
+
+
+def benchmark(granule: bytes, use_arrow: bool, fields: list | None, repeat: int) -> list[float]:
+    """Return the wall time in milliseconds of each run."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        read_items(granule, use_arrow, fields)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs per reader")
+    parser.add_argument("--data", default=os.path.join("tests", "data"), help="directory of granule zips")
+    parser.add_argument("--fields", help="comma separated attributes to read, all attributes when omitted")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if swot_shp.pa is None:
+        raise SystemExit("pyarrow is not installed")
+    fields = args.fields.split(",") if args.fields else None
+
+    print(f"repeat={args.repeat}, fields={args.fields or 'all'}")
+    for path in sorted(glob.glob(os.path.join(args.data, "*.zip"))):
+        with open(path, "rb") as granule_file:
+            granule = granule_file.read()
+        items = read_items(granule, True, fields)
+        if items != read_items(granule, False, fields):
+            raise SystemExit(f"Items differ for {path}")
+
+        print(f"{os.path.basename(path)}: {len(items)} items, {len(items[0]) if items else 0} attributes")
+        for name, use_arrow in (("geopandas", False), ("arrow", True)):
+            timings = benchmark(granule, use_arrow, fields, args.repeat)
+            print(f"{name:>12}: median {statistics.median(timings):8.2f} ms  min {min(timings):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Bulk load a directory of granule zips into a Hydrocron table.
+
+Granules are decoded with swot_shp.read_shapefile in a process pool and
+written by the main process through HydrocronTable.batch_fill_table, whose
+threaded batch writer sends concurrent BatchWriteItem requests while the
+next granules are decoded. Only granules of the table's feature type are
+loaded and track ingest records are not written.
+
+Every loaded granule is appended to a JSON lines manifest, and granules the
+manifest lists as complete are skipped, so an interrupted load resumes
+where it stopped. Writes can be held to a write capacity budget in WCU per
+second. Run from the repository root in the poetry environment, for
+example against DynamoDB Local:
+
+    poetry run python scripts/bulk_load.py tests/data --table hydrocron-swot-reach-table \\
+        --endpoint-url http://localhost:8000 --processes 4 --writers 8 --wcu 1000
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator
+
+from hydrocron.db import HydrocronTable
+from hydrocron.db.batch_writer import UnprocessedItems
+from hydrocron.db.item_size import item_size
+from hydrocron.db.load_data import read_data
+from hydrocron.utils import connection, constants
+
+MANIFEST_NAME = "bulk_load_manifest.jsonl"
+
+
+class WriteBudget:
+    """Token bucket of write capacity units refilled at a fixed rate per second."""
+
+    def __init__(self, wcu_per_second: float):
+        self.rate = wcu_per_second
+        self.tokens = wcu_per_second
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, units: float) -> None:
+        """Wait until the budget has the units, then spend them."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= units
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+def throttle(items: Iterable[dict], budget: WriteBudget | None) -> Iterator[dict]:
+    """Yield items as the budget allows, one WCU per started KB of each item."""
+    for item in items:
+        if budget is not None:
+            budget.acquire(max(1, math.ceil(item_size(item) / 1024)))
+        yield item
+
+
+def decode_granule(path: str, obscure_data: bool) -> tuple[str, list, float]:
+    """Read the items of a granule in a worker process."""
+    start = time.perf_counter()
+    items = read_data(path, obscure_data)
+    return path, items, time.perf_counter() - start
+
+
+def decode_granules(pool: ProcessPoolExecutor, paths: list[str], obscure_data: bool, ahead: int) -> Iterator[tuple[str, list, float]]:
+    """Yield decoded granules in order, keeping at most ahead granules decoding."""
+    pending = []
+    for path in paths:
+        pending.append(pool.submit(decode_granule, path, obscure_data))
+        if len(pending) >= ahead:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+def read_manifest(manifest: str) -> set[str]:
+    """Return the names of the granules the manifest lists as complete."""
+    if not os.path.exists(manifest):
+        return set()
+    with open(manifest, encoding="utf-8") as manifest_file:
+        records = [json.loads(line) for line in manifest_file if line.strip()]
+    return {record["granule"] for record in records if record["status"] == "complete"}
+
+
+def find_granules(directory: str, pattern: str, table_name: str) -> list[str]:
+    """Return the granules of the table's feature type in the directory."""
+    for table_info in constants.TABLE_COLLECTION_INFO:
+        if table_info["table_name"] == table_name:
+            feature_type = table_info["feature_type"]
+            break
+    else:
+        raise SystemExit(f"Unknown table {table_name}, expected one of the tables in TABLE_COLLECTION_INFO")
+
+    return [path for path in sorted(glob.glob(os.path.join(directory, pattern)))
+            if feature_type in os.path.basename(path)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", help="directory of granule zips")
+    parser.add_argument("--table", required=True, help="name of the table to load")
+    parser.add_argument("--pattern", default="*.zip", help="glob of the granules to load in the directory")
+    parser.add_argument("--manifest", help=f"manifest of loaded granules, {MANIFEST_NAME} in the directory by default")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="number of processes decoding granules")
+    parser.add_argument("--writers", type=int, default=8, help="number of concurrent BatchWriteItem requests")
+    parser.add_argument("--wcu", type=float, default=0, help="write capacity units per second to stay under, 0 for no limit")
+    parser.add_argument("--endpoint-url", help="DynamoDB endpoint, e.g. http://localhost:8000 for DynamoDB Local")
+    parser.add_argument("--obscure-data", action="store_true", help="obscure data values as the granule lambda can")
+    parser.add_argument("--verbose", action="store_true", help="log the progress of each granule")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    if args.endpoint_url:
+        os.environ["HYDROCRON_dynamodb_endpoint_url"] = args.endpoint_url
+    manifest = args.manifest or os.path.join(args.directory, MANIFEST_NAME)
+
+    paths = find_granules(args.directory, args.pattern, args.table)
+    complete = read_manifest(manifest)
+    todo = [path for path in paths if os.path.basename(path) not in complete]
+    print(f"{len(paths)} granules for {args.table}, {len(paths) - len(todo)} already loaded, {len(todo)} to load")
+    if not todo:
+        return
+
+    hydrocron_table = HydrocronTable.get(connection.dynamodb_resource, args.table, describe=True)
+    budget = WriteBudget(args.wcu) if args.wcu > 0 else None
+    processes = max(1, min(args.processes or 1, len(todo)))
+
+    granule_count = item_count = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as pool, open(manifest, "a", encoding="utf-8") as manifest_file:
+        for path, items, decode_seconds in decode_granules(pool, todo, args.obscure_data, 2 * processes):
+            write_start = time.perf_counter()
+            try:
+                stats = hydrocron_table.batch_fill_table(throttle(items, budget), max_workers=args.writers)
+            except UnprocessedItems as err:
+                stats = err.stats
+            write_seconds = time.perf_counter() - write_start
+
+            status = "complete" if stats is not None and not stats["unprocessed"] else "incomplete"
+            manifest_file.write(json.dumps({
+                "granule": os.path.basename(path),
+                "status": status,
+                "items": len(items),
+                "written": stats["written"] if stats else 0,
+                "decode_seconds": round(decode_seconds, 3),
+                "write_seconds": round(write_seconds, 3)
+            }) + "\n")
+            manifest_file.flush()
+
+            granule_count += 1
+            item_count += stats["written"] if stats else 0
+            elapsed = time.perf_counter() - start
+            print(f"[{granule_count}/{len(todo)}] {os.path.basename(path)}: {status}, {len(items)} items, "
+                  f"decode {decode_seconds:.2f} s, write {write_seconds:.2f} s | "
+                  f"{granule_count / elapsed:.2f} granules/s, {item_count / elapsed:.1f} items/s")
+
+    elapsed = time.perf_counter() - start
+    print(f"Loaded {granule_count} granules and {item_count} items in {elapsed:.1f} s: "
+          f"{granule_count / elapsed:.2f} granules/s, {item_count / elapsed:.1f} items/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -179,6 +179,22 @@ data "aws_iam_policy_document" "lambda-invoke-policy" {
 }
 
 
+# The granule load lambda invokes itself to retry the failed granules of a batch,
+# the ARN is built from the name to avoid a cycle between the function and its role
+data "aws_iam_policy_document" "lambda-invoke-granule-retry-policy" {
+
+  statement {
+    effect = "Allow"
+    actions = [
+      "lambda:InvokeFunction"
+    ]
+    resources = [
+      "arn:aws:lambda:${data.aws_region.current.id}:${local.account_id}:function:${local.load_granule_function_name}"
+    ]
+  }
+}
+
+
 data "aws_iam_policy_document" "lambda-invoke-authorizer-policy" {
 
   statement {
@@ -465,6 +481,10 @@ resource "aws_iam_role" "hydrocron-lambda-load-granule-role" {
     name   = "HydrocronS3Read"
     policy = data.aws_iam_policy_document.s3-read-policy.json
   }
+  inline_policy {
+    name   = "HydrocronLambdaInvoke"
+    policy = data.aws_iam_policy_document.lambda-invoke-granule-retry-policy.json
+  }
   inline_policy {
     policy = data.aws_iam_policy_document.lambda_log_to_cloudwatch.json
   }
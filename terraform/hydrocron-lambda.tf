@@ -19,6 +19,10 @@ locals {
   load_granule_function_name       = "${local.aws_resource_prefix}-load_granule-lambda"
   cnm_response_function_name       = "${local.aws_resource_prefix}-cnm-lambda"
   track_ingest_function_name       = "${local.aws_resource_prefix}-track-ingest-lambda"
+  # Each granule load writes with its own batch writer threads, the boto3 connection pool is sized for all of them
+  load_granule_workers             = 4
+  load_granule_batch_writers       = 8
+  load_granule_pool_connections    = local.load_granule_workers * local.load_granule_batch_writers + 8
   sit_env                          = var.stage == "sit" ? "SIT" : ""
   uat_env                          = var.stage == "uat" ? "UAT" : ""
   prod_env                         = var.stage == "ops" ? "PROD" : ""
@@ -77,6 +81,12 @@ resource "aws_lambda_function" "hydrocron_lambda_timeseries" {
       DEFAULT_COLLECTION_VERSION = "D"
       DEFAULT_LAKE_COLLECTION    = "SWOT_L2_HR_LakeSP"
       DEFAULT_RIVER_COLLECTION   = "SWOT_L2_HR_RiverSP"
+      QUERY_SEGMENTS             = 4
+      QUERY_MAX_WORKERS          = 4
+      PAGE_TOKEN_SECRET          = aws_ssm_parameter.page-token-secret-parameter.value
+      RESPONSE_CACHE_SIZE        = 8388608
+      RESPONSE_CACHE_TTL         = 60 # Bounds how long a cached response can miss newly ingested granules
+      MAX_FEATURE_IDS            = 100
     }
   }
   tags = var.default_tags
@@ -116,6 +126,11 @@ resource "aws_lambda_function" "hydrocron_lambda_authorizer" {
     subnet_ids         = data.aws_subnets.private_application_subnets.ids
     security_group_ids = data.aws_security_groups.vpc_default_sg.ids
   }
+  environment {
+    variables = {
+      API_KEY_TTL = 300
+    }
+  }
   tags = var.default_tags
 
   /**
@@ -149,6 +164,7 @@ resource "aws_lambda_function" "hydrocron_lambda_load_data" {
       EARTHDATA_PASSWORD           = data.aws_ssm_parameter.edl_password.value
       GRANULE_LAMBDA_FUNCTION_NAME = aws_lambda_function.hydrocron_lambda_load_granule.function_name
       CMR_ENV                      = "${coalesce(local.sit_env, local.uat_env, local.prod_env)}"
+      GRANULE_BATCH_SIZE           = 8
     }
   }
 }
@@ -164,6 +180,8 @@ resource "aws_lambda_function" "hydrocron_lambda_load_granule" {
   role          = aws_iam_role.hydrocron-lambda-load-granule-role.arn
   timeout       = 900
   memory_size   = 8192
+
+  reserved_concurrent_executions = var.load_granule_concurrency
   vpc_config {
     subnet_ids         = data.aws_subnets.private_application_subnets.ids
     security_group_ids = data.aws_security_groups.vpc_default_sg.ids
@@ -171,7 +189,11 @@ resource "aws_lambda_function" "hydrocron_lambda_load_granule" {
   tags = var.default_tags
   environment {
     variables = {
-      OBSCURE_DATA = "false"
+      OBSCURE_DATA                 = "false"
+      GRANULE_LAMBDA_FUNCTION_NAME = local.load_granule_function_name
+      BATCH_WRITE_WORKERS          = local.load_granule_batch_writers
+      GRANULE_WORKERS              = local.load_granule_workers
+      AWS_MAX_POOL_CONNECTIONS     = local.load_granule_pool_connections
     }
   }
 }
@@ -191,6 +213,7 @@ resource "aws_lambda_function" "hydrocron_lambda_cnm" {
   environment {
     variables = {
       GRANULE_LAMBDA_FUNCTION_NAME = aws_lambda_function.hydrocron_lambda_load_granule.function_name
+      GRANULE_BATCH_SIZE           = 8
     }
   }
 }
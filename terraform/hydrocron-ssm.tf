@@ -28,6 +28,20 @@ resource "aws_ssm_parameter" "trusted-user-parameter" {
 }
 
 
+resource "random_password" "page-token-secret" {
+  length  = 64
+  special = false
+}
+
+
+resource "aws_ssm_parameter" "page-token-secret-parameter" {
+  name        = "/service/${var.app_name}/page-token-secret"
+  description = "Hydrocron timeseries page token signing secret"
+  type        = "SecureString"
+  value       = random_password.page-token-secret.result
+}
+
+
 resource "aws_ssm_parameter" "hydrocron-reach-track-ingest-runtime" {
   name        = "/service/${var.app_name}/track-ingest-runtime/SWOT_L2_HR_RiverSP_reach_D"
   description = "Hydrocron track ingest last time executed on reaches"
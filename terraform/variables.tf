@@ -27,3 +27,9 @@ variable "cross_account_ids" {
     error_message = "cross_account_ids must contain one or more 12-digit AWS account IDs."
   }
 }
+
+variable "load_granule_concurrency" {
+  type        = number
+  default     = -1
+  description = "Reserved concurrency of the granule load lambda, caps how many granule batches load at once. -1 leaves it unreserved"
+}
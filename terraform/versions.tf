@@ -10,7 +10,8 @@ terraform {
   }
 
   required_providers {
-    aws = "~> 4.0"
+    aws    = "~> 4.0"
+    random = "~> 3.0"
   }
   required_version = ">= 1.9.3"
 }
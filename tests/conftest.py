@@ -2,6 +2,7 @@
 conftest file to set up local dynamodb connection
 """
 import datetime
+import json
 import os.path
 
 import boto3
@@ -21,6 +22,12 @@ TEST_SHAPEFILE_PATH_REACH = os.path.join(
     'SWOT_L2_HR_RiverSP_Reach_548_011_NA_20230610T193337_20230610T193344_PIA1_01.zip'  # noqa
 )
 
+TEST_QUERY_RESULTS_REACH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    'test_data',
+    'api_query_results_items_reach.json'
+)
+
 TEST_SHAPEFILE_PATH_REACH_TRACK = os.path.join(
     os.path.dirname(os.path.realpath(__file__)),
     'data',
@@ -341,6 +348,36 @@ def hydrocron_api(hydrocron_dynamo_instance, dynamo_test_proc, mock_ssm):
     hydrocron.utils.connection._dynamodb_resource = hydrocron_dynamo_instance
 
 
+@pytest.fixture()
+def reach_query_items():
+    """
+    Items returned by a reach timeseries query
+    """
+    with open(TEST_QUERY_RESULTS_REACH) as jf:
+        return json.load(jf)
+
+
+@pytest.fixture()
+def timeseries_event():
+    """
+    Timeseries request event for a single reach
+    """
+    return {
+        "body": {
+            "feature": "Reach",
+            "feature_id": "71224100223",
+            "start_time": "2023-06-04T00:00:00Z",
+            "end_time": "2023-06-23T00:00:00Z",
+            "output": "geojson",
+            "fields": "reach_id,time_str,wse"
+        },
+        "headers": {
+            "User-Agent": "curl/8.4.0",
+            "X-Forwarded-For": "123.456.789.000"
+        }
+    }
+
+
 @pytest.fixture()
 def s3_connection():
     import hydrocron.utils.connection  # noqa: E501 # pylint: disable=import-outside-toplevel
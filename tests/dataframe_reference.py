@@ -0,0 +1,87 @@
+"""
+GeoDataFrame implementation of the timeseries response formatting that
+format_csv and format_json replaced, kept as the reference their output is
+compared against.
+"""
+import json
+
+import geopandas as gpd
+import pandas as pd
+from shapely.wkt import loads
+
+from hydrocron.utils import constants
+
+
+def convert_to_df(items) -> gpd.GeoDataFrame:
+    """Convert reach-level results for GeoPandas Dataframe.
+
+    :param items Dictionary of query results
+    :type items: dict
+
+    :rtype: gpd.GeoDataFrame
+    """
+
+    df = pd.DataFrame.from_records(items, index=range(len(items)))
+    if 'geometry' not in df.columns:   # Geometry is not projected for CSV requests without it
+        return gpd.GeoDataFrame(df)
+    df['geometry'] = df['geometry'].apply(loads)
+    gdf = gpd.GeoDataFrame(df, geometry='geometry')
+    return gdf
+
+
+def fill_missing_columns(gdf, columns):
+    """Add missing columns to GeoDataFrame with fill value. Resolves aliases."""
+    # First, ensure all non-alias columns exist and are filled (order-independent).
+    for col in columns:
+        if col == "geometry" or col in constants.FIELD_ALIASES:
+            continue
+        if col not in gdf.columns:
+            gdf[col] = constants.FILL_VALUE
+        else:
+            gdf[col] = gdf[col].fillna(constants.FILL_VALUE)
+
+    # Second, resolve aliases after sources have been created/filled.
+    for alias, source in constants.FIELD_ALIASES.items():
+        if alias not in columns:
+            continue
+        if source in gdf.columns:
+            gdf[alias] = gdf[source].fillna(constants.FILL_VALUE)
+        else:
+            gdf[alias] = constants.FILL_VALUE
+
+    return gdf
+
+
+def add_units(gdf, columns):
+    """Add units to list of columns to return in response
+
+    :param gdf: DataFrame of results from query
+    :type gdf: gpd.GeoDataFrame
+    :param columns: List of columns to return in response
+    :type columns: list of str
+    """
+
+    gdf_columns = gdf.columns.values.tolist()
+    unit_columns = [f"{column}_units" for column in columns if f"{column}_units" in gdf_columns]
+    return columns + unit_columns
+
+
+def format_json_dataframe(items, fields):
+    """GeoJSON FeatureCollection built through a GeoDataFrame and a
+    to_json/json.loads round trip."""
+
+    gdf = convert_to_df(items)
+    columns = add_units(gdf, fields.split(','))
+    if 'geometry' not in fields:
+        columns.append('geometry')   # Add geometry to convert to geoJSON
+    gdf = fill_missing_columns(gdf, columns)
+    return json.loads(gdf[columns].to_json())
+
+
+def format_csv_dataframe(items, fields):
+    """CSV written from a GeoDataFrame."""
+
+    gdf = convert_to_df(items)
+    columns = add_units(gdf, fields.split(','))
+    gdf = fill_missing_columns(gdf, columns)
+    return gdf[columns].to_csv(index=False)
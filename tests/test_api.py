@@ -7,7 +7,6 @@ import pathlib
 
 import pytest
 import geojson
-import geopandas as gpd
 import json
 import numpy as np
 from numpy.testing import assert_almost_equal
@@ -152,91 +151,572 @@ def test_timeseries_lambda_handler_csv(hydrocron_api):
     assert result['results']['csv'] == row_str
 
 
-def test_timeseries_convert_to_df_lake(hydrocron_api):
+def test_timeseries_format_json_lake():
     """
-    Test conver_to_df function to make sure it creates a correctly formatted
-    GeoDataFrame.
+    Test format_json formats lake query results with fill values and point
+    geometries.
     """
     import hydrocron.api.controllers.timeseries
+    from tests import dataframe_reference
 
     test_data = (pathlib.Path(os.path.dirname(os.path.realpath(__file__)))
                  .joinpath('test_data').joinpath('api_query_results_items_lake.json'))
     with open(test_data) as jf:
         items = json.load(jf)
-    gdf = hydrocron.api.controllers.timeseries.convert_to_df(items)
+    fields = "lake_id,wse,p_lat,time,geometry"
+    data, _ = hydrocron.api.controllers.timeseries.format_json(items, fields)
+    assert data["response"] == dataframe_reference.format_json_dataframe(items, fields)
+
+    features = data["response"]["features"]
     assert_almost_equal(np.array([-999999999999.0, -999999999999.0], dtype=np.float64),
-                        gdf['wse'].to_numpy().astype(np.float64))
+                        np.array([feature["properties"]["wse"] for feature in features], dtype=np.float64))
     assert_almost_equal(np.array([68.693765, 68.693765], dtype=np.float64),
-                        gdf['p_lat'].to_numpy().astype(np.float64))
+                        np.array([feature["properties"]["p_lat"] for feature in features], dtype=np.float64))
     assert_almost_equal(np.array([-999999999999.0, -999999999999.0], dtype=np.float64),
-                        gdf['time'].to_numpy().astype(np.float64))
-    geo_array = gpd.points_from_xy(x=[-20.455824376849105, -20.455824376849105],
-                                   y=[-25.566241858842833, -25.566241858842833]).to_numpy()
-    assert str(geo_array) == str(gdf['geometry'].to_numpy())
+                        np.array([feature["properties"]["time"] for feature in features], dtype=np.float64))
+    assert [feature["geometry"] for feature in features] == [
+        {"type": "Point", "coordinates": [-20.455824376849105, -25.566241858842833]}] * 2
 
 
-def test_timeseries_convert_to_df_node():
+def test_timeseries_format_json_node():
     """
-    Test conver_to_df function to make sure it creates a correctly formatted
-    GeoDataFrame.
+    Test format_json formats node query results with fill values and point
+    geometries.
     """
     import hydrocron.api.controllers.timeseries
+    from tests import dataframe_reference
 
     test_data = (pathlib.Path(os.path.dirname(os.path.realpath(__file__)))
                  .joinpath('test_data').joinpath('api_query_results_items_node.json'))
     with open(test_data) as jf:
         items = json.load(jf)
-    gdf = hydrocron.api.controllers.timeseries.convert_to_df(items)
+    fields = "node_id,wse,width,time,geometry"
+    data, _ = hydrocron.api.controllers.timeseries.format_json(items, fields)
+    assert data["response"] == dataframe_reference.format_json_dataframe(items, fields)
+
+    features = data["response"]["features"]
     assert_almost_equal(np.array([319.3727, 321.95384, 320.88183], dtype=np.float64),
-                        gdf['wse'].to_numpy().astype(np.float64))
+                        np.array([feature["properties"]["wse"] for feature in features], dtype=np.float64))
     assert_almost_equal(np.array([-999999999999.0, -999999999999.0, -999999999999.0], dtype=np.float64),
-                        gdf['width'].to_numpy().astype(np.float64))
+                        np.array([feature["properties"]["width"] for feature in features], dtype=np.float64))
     assert_almost_equal(np.array([735105930.351, 735449281.545, 735792633.34], dtype=np.float64),
-                        gdf['time'].to_numpy().astype(np.float64))
-    geo_array = gpd.points_from_xy(x=[-95.060448, -95.060448, -95.060448],
-                                   y=[49.359134, 49.359134, 49.359134]).to_numpy()
-    assert str(geo_array) == str(gdf['geometry'].to_numpy())
+                        np.array([feature["properties"]["time"] for feature in features], dtype=np.float64))
+    assert [feature["geometry"] for feature in features] == [
+        {"type": "Point", "coordinates": [-95.060448, 49.359134]}] * 3
 
 
-def test_timeseries_convert_to_df_reach():
+def test_timeseries_format_json_reach(reach_query_items):
     """
-    Test conver_to_df function to make sure it creates a correctly formatted
-    GeoDataFrame.
+    Test format_json formats reach query results, filling missing values.
     """
     import hydrocron.api.controllers.timeseries
 
-    test_data = (pathlib.Path(os.path.dirname(os.path.realpath(__file__)))
-                 .joinpath('test_data').joinpath('api_query_results_items_reach.json'))
-    with open(test_data) as jf:
-        items = json.load(jf)
-    gdf = hydrocron.api.controllers.timeseries.convert_to_df(items)
+    data, _ = hydrocron.api.controllers.timeseries.format_json(reach_query_items, "reach_id,wse,width,slope")
+    features = data["response"]["features"]
     assert_almost_equal(np.array([320.2114, 322.3147, 323.3131], dtype=np.float64),
-                        gdf['wse'].to_numpy().astype(np.float64))
+                        np.array([feature["properties"]["wse"] for feature in features], dtype=np.float64))
     assert_almost_equal(np.array([-999999999999.0, -999999999999.0, -999999999999.0], dtype=np.float64),
-                        gdf['width'].to_numpy().astype(np.float64))
+                        np.array([feature["properties"]["width"] for feature in features], dtype=np.float64))
     assert_almost_equal(np.array([-999999999999.0, -999999999999.0, -999999999999.0], dtype=np.float64),
-                        gdf['slope'].to_numpy().astype(np.float64))
+                        np.array([feature["properties"]["slope"] for feature in features], dtype=np.float64))
+
+
+def test_format_units(reach_query_items):
+    """
+    Test the units of the requested fields follow the fields in CSV and
+    GeoJSON responses.
+    """
+    import hydrocron.api.controllers.timeseries
+
+    fields = "reach_id,wse,width,slope,slope2,geometry"
+    expected_columns = ["reach_id", "wse", "width", "slope", "slope2", "geometry", "wse_units", "width_units",
+                        "slope_units", "slope2_units"]
 
+    data, _ = hydrocron.api.controllers.timeseries.format_csv(reach_query_items, fields)
+    assert next(csv.reader(data["response"].splitlines())) == expected_columns
 
-def test_add_units():
+    data, _ = hydrocron.api.controllers.timeseries.format_json(reach_query_items, fields)
+    assert list(data["response"]["features"][0]["properties"]) == expected_columns[:5] + expected_columns[6:]
+    assert data["response"]["features"][0]["properties"]["wse_units"] == reach_query_items[0]["wse_units"]
+
+
+def test_format_csv(reach_query_items):
     """
-    Test add_units function.
+    Test format_csv writes the same CSV as the DataFrame path with units,
+    aliases and fill values resolved.
     """
 
     import hydrocron.api.controllers.timeseries
+    from tests import dataframe_reference
 
-    test_data = (pathlib.Path(os.path.dirname(os.path.realpath(__file__)))
-                 .joinpath('test_data').joinpath('api_query_results_items_reach.json'))
-    with open(test_data) as jf:
-        items = json.load(jf)
-    gdf = hydrocron.api.controllers.timeseries.convert_to_df(items)
+    items = reach_query_items
+    items[1].pop("wse")
+    items[2]["sos_consensus_q"] = "12.5"
+    fields = "reach_id,time_str,wse,slope,swot_discharge_reanalysis,geometry"
 
-    columns = ["reach_id", "wse", "width", "slope", "slope2", "geometry"]
-    columns = hydrocron.api.controllers.timeseries.add_units(gdf, columns)
+    expected = dataframe_reference.format_csv_dataframe(items, fields)
 
-    expected_columns = ["reach_id", "wse", "width", "slope", "slope2", "geometry", "wse_units", "width_units",
-                        "slope_units", "slope2_units"]
-    assert expected_columns == columns
+    data, hits = hydrocron.api.controllers.timeseries.format_csv(items, fields)
+    assert data == {"http_code": "200 OK", "response": expected}
+    assert hits == 3
+
+    rows = list(csv.DictReader(data["response"].splitlines()))
+    assert [row["wse"] for row in rows] == ["320.2114", "-999999999999.0", "323.3131"]
+    assert [row["swot_discharge_reanalysis"] for row in rows] == ["-999999999999.0", "-999999999999.0", "12.5"]
+
+
+def test_format_json(reach_query_items):
+    """
+    Test format_json builds the same FeatureCollection as GeoDataFrame.to_json.
+    """
+
+    import hydrocron.api.controllers.timeseries
+    from tests import dataframe_reference
+
+    items = reach_query_items
+    items[1].pop("wse")
+    fields = "reach_id,time_str,wse,slope"
+
+    expected = dataframe_reference.format_json_dataframe(items, fields)
+
+    data, hits = hydrocron.api.controllers.timeseries.format_json(items, fields)
+    assert data == {"http_code": "200 OK", "response": expected}
+    assert hits == 3
+    assert data["response"]["features"][1]["properties"]["wse"] == "-999999999999.0"
+    assert geojson.loads(json.dumps(data["response"])).is_valid
+
+
+def test_intern_geometries(monkeypatch, reach_query_items):
+    """
+    Test each distinct geometry is parsed once and shared between the rows
+    of a response.
+    """
+
+    import hydrocron.api.controllers.timeseries
+    from tests import dataframe_reference
+
+    items = reach_query_items
+
+    parsed = []
+
+    def parse(wkt):
+        parsed.append(wkt)
+        return [f"parsed {i}" for i in range(len(wkt))]
+
+    wkt = [item["geometry"] for item in items] + ["POINT (1 2)"]
+    geometries = hydrocron.api.controllers.timeseries.intern_geometries(wkt, parse)
+    assert parsed == [[items[0]["geometry"], "POINT (1 2)"]]
+    assert geometries == {items[0]["geometry"]: "parsed 0", "POINT (1 2)": "parsed 1"}
+
+    converted = []
+    wkt_to_geojson = hydrocron.api.controllers.timeseries._wkt_to_geojson
+
+    def count_wkt_to_geojson(wkt):
+        converted.append(wkt)
+        return wkt_to_geojson(wkt)
+
+    monkeypatch.setattr(hydrocron.api.controllers.timeseries, "_wkt_to_geojson", count_wkt_to_geojson)
+    data, _ = hydrocron.api.controllers.timeseries.format_json(items, "reach_id,wse")
+    features = data["response"]["features"]
+    assert converted == [[items[0]["geometry"]]]
+    assert features[0]["geometry"] is features[2]["geometry"]
+
+    data, _ = hydrocron.api.controllers.timeseries.format_csv(items, "reach_id,geometry")
+    rows = list(csv.DictReader(data["response"].splitlines()))
+    assert rows[0]["geometry"] == rows[2]["geometry"] == dataframe_reference.format_csv_dataframe(
+        items[:1], "reach_id,geometry").splitlines()[1].split(",", 1)[1].strip('"')
+
+
+def test_format_json_compact(reach_query_items):
+    """
+    Test compact GeoJSON aggregates each property into an array and returns
+    only the first geometry.
+    """
+
+    import hydrocron.api.controllers.timeseries
+
+    items = reach_query_items
+    items[1].pop("wse")
+    fields = "reach_id,time_str,wse,slope"
+
+    full, _ = hydrocron.api.controllers.timeseries.format_json(items, fields)
+    data, hits = hydrocron.api.controllers.timeseries.format_json(items, fields, compact=True)
+    features = full["response"]["features"]
+    assert hits == 3
+    assert data["response"] == {
+        "type": "FeatureCollection",
+        "features": [{
+            "id": "0",
+            "type": "Feature",
+            "properties": {field: [feature["properties"][field] for feature in features]
+                           for field in features[0]["properties"]},
+            "geometry": features[0]["geometry"]
+        }]
+    }
+    assert data["response"]["features"][0]["properties"]["wse"][1] == "-999999999999.0"
+
+
+def test_format_json_compact_groups(reach_query_items):
+    """
+    Test compact GeoJSON returns a feature for each group of items.
+    """
+
+    import hydrocron.api.controllers.timeseries
+
+    items = reach_query_items
+    fields = "reach_id,time_str,wse"
+
+    groups = [items[:2], [], items[2:]]
+    data, hits = hydrocron.api.controllers.timeseries.format_json(items, fields, compact=True, groups=groups)
+    features = data["response"]["features"]
+    assert hits == 3
+    assert [feature["id"] for feature in features] == ["0", "1"]
+    assert features[0]["properties"]["time_str"] == [item["time_str"] for item in items[:2]]
+    assert features[1]["properties"]["time_str"] == [items[2]["time_str"]]
+
+
+def test_wkt_to_geojson():
+    """
+    Test simple WKT geometries are converted without shapely and match the
+    shapely conversion.
+    """
+
+    import shapely
+    import hydrocron.api.controllers.timeseries
+
+    wkt = [
+        "POINT (-95.123456 29.654321)",
+        "LINESTRING (171.598243 -42.295839, 171.598605 -42.295621)",
+        "POLYGON ((0 0, 1 0, 1 1, 0 0), (0.1 0.1, 0.2 0.1, 0.2 0.2, 0.1 0.1))",
+        "MULTIPOINT ((1 2), (3 4))",
+        "POINT Z (1 2 3)"
+    ]
+    expected = [json.loads(geometry) for geometry in shapely.to_geojson(shapely.from_wkt(wkt))]
+    assert hydrocron.api.controllers.timeseries._wkt_to_geojson(wkt + [None]) == expected + [None]
+
+    assert hydrocron.api.controllers.timeseries._parse_simple_wkt(wkt[0]) == expected[0]
+    for unsupported in wkt[3:]:
+        with pytest.raises(ValueError):
+            hydrocron.api.controllers.timeseries._parse_simple_wkt(unsupported)
+
+
+def test_get_projection_attributes():
+    """
+    Test get_projection_attributes function.
+    """
+
+    import hydrocron.api.controllers.timeseries
+
+    attributes = hydrocron.api.controllers.timeseries.get_projection_attributes(
+        "reach_id,time,wse,swot_discharge_reanalysis", "csv")
+    assert attributes == ["reach_id", "reach_id_units", "time", "time_units", "wse", "wse_units",
+                          "sos_consensus_q", "swot_discharge_reanalysis_units"]
+
+    attributes = hydrocron.api.controllers.timeseries.get_projection_attributes("reach_id,geometry", "geojson")
+    assert attributes == ["reach_id", "reach_id_units", "geometry", "geometry_units"]
+
+
+def test_get_projection_args():
+    """
+    Test ProjectionExpression arguments use placeholders for reserved words.
+    """
+
+    from hydrocron.api.data_access.db import DynamoDataRepository
+
+    projection_args = DynamoDataRepository._get_projection_args(["reach_id", "time", "wse", "time"])
+    assert projection_args == {
+        "ProjectionExpression": "#p0, #p1, #p2",
+        "ExpressionAttributeNames": {"#p0": "reach_id", "#p1": "time", "#p2": "wse"}
+    }
+
+
+def test_get_time_segments():
+    """
+    Test splitting a time range into contiguous segments for concurrent queries.
+    """
+
+    from hydrocron.api.data_access.db import DynamoDataRepository
+
+    segments = DynamoDataRepository._get_time_segments("2024-01-01T00:00:00+0000", "2024-01-04T00:00:00+0000", 3)
+    assert segments == [
+        ("2024-01-01T00:00:00+0000", "2024-01-02T00:00:00"),
+        ("2024-01-02T00:00:00", "2024-01-03T00:00:00"),
+        ("2024-01-03T00:00:00", "2024-01-04T00:00:00+0000")
+    ]
+
+    # Ranges too short to split and single segments are queried as is
+    assert DynamoDataRepository._get_time_segments("2024-01-01T00:00:00+0000", "2024-01-01T00:00:01+0000", 3) == \
+        [("2024-01-01T00:00:00+0000", "2024-01-01T00:00:01+0000")]
+    assert DynamoDataRepository._get_time_segments("2024-01-01T00:00:00+0000", "2024-01-04T00:00:00+0000", 1) == \
+        [("2024-01-01T00:00:00+0000", "2024-01-04T00:00:00+0000")]
+
+
+def test_get_series_by_feature_id_segmented(hydrocron_api):
+    """
+    Test segmented queries return the same items in the same order as a
+    single query.
+    """
+
+    from hydrocron.api.data_access.db import DynamoDataRepository
+    import hydrocron.utils.connection
+
+    data_repository = DynamoDataRepository(hydrocron.utils.connection._dynamodb_resource)
+    args = ("SWOT_L2_HR_RiverSP_node_D", "Node", "31241400580011", "2026-01-01T00:00:00+0000", "2026-12-31T00:00:00+0000")
+    expected = data_repository.get_series_by_feature_id(*args)
+
+    data_repository.QUERY_SEGMENTS = 12
+    results = data_repository.get_series_by_feature_id(*args)
+    assert results["Items"] == expected["Items"]
+    assert results["Count"] == expected["Count"]
+
+
+def test_response_size_estimator(reach_query_items):
+    """
+    Test the running response size estimate for keyed and unkeyed output.
+    """
+
+    from hydrocron.api.data_access.db import ResponseSizeEstimator
+
+    item = {field: reach_query_items[0][field] for field in ("reach_id", "wse")}
+
+    size_estimator = ResponseSizeEstimator(max_size=60)
+    assert size_estimator.item_size(item) == (11 + 3) + (8 + 3) + (8 + 3) + (3 + 3)
+    assert size_estimator.add([item]) is False
+    assert size_estimator.add([item]) is True
+
+    size_estimator = ResponseSizeEstimator(keyed=False)
+    assert size_estimator.item_size(item) == (11 + 3) + (8 + 3)
+    assert size_estimator.add([item] * 1000) is False
+
+
+def test_read_pages_stops_when_budget_exceeded(reach_query_items):
+    """
+    Test that no further pages are requested once the response budget is exceeded.
+    """
+
+    from hydrocron.api.data_access.db import DynamoDataRepository, PayloadTooLarge, ResponseSizeEstimator
+
+    requested = []
+
+    def pages():
+        for page_number in range(10):
+            requested.append(page_number)
+            yield {"Items": [{"wse": reach_query_items[0]["wse"]}] * 100, "Count": 100, "ScannedCount": 100, "ResponseMetadata": {}}
+
+    with pytest.raises(PayloadTooLarge) as e:
+        DynamoDataRepository._read_pages(pages(), ResponseSizeEstimator(max_size=3000, keyed=False))
+    assert str(e.value) == "413: Query exceeds 0.00286102MB after reading 300 hits"
+    assert requested == [0, 1, 2]
+
+    items = DynamoDataRepository._read_pages(pages(), ResponseSizeEstimator())
+    assert len(items["Items"]) == 1000 and items["Count"] == 1000
+
+
+def test_get_series_by_feature_id_paginated(hydrocron_api):
+    """
+    Test reading a series in pages with limit and exclusive_start_key returns
+    the same items as a single query.
+    """
+
+    from hydrocron.api.data_access.db import DynamoDataRepository
+    import hydrocron.utils.connection
+
+    data_repository = DynamoDataRepository(hydrocron.utils.connection._dynamodb_resource)
+    args = ("SWOT_L2_HR_RiverSP_node_D", "Node", "31241400580011", "2026-01-01T00:00:00+0000", "2026-12-31T00:00:00+0000")
+    expected = data_repository.get_series_by_feature_id(*args)
+
+    items = []
+    exclusive_start_key = None
+    while True:
+        results = data_repository.get_series_by_feature_id(*args, attributes=["node_id", "time_str"], limit=2,
+                                                           exclusive_start_key=exclusive_start_key)
+        assert results["Count"] <= 2
+        items.extend(results["Items"])
+        exclusive_start_key = results.get("LastEvaluatedKey")
+        if not exclusive_start_key:
+            break
+    assert [item["time_str"] for item in items] == [item["time_str"] for item in expected["Items"]]
+
+
+def test_query_hydrocron_table_limit():
+    """
+    Test that a limited query stops requesting pages once the limit is read.
+    """
+
+    from hydrocron.api.data_access.db import DynamoDataRepository
+
+    class Table:
+        def __init__(self):
+            self.requests = []
+
+        def query(self, **kwargs):
+            self.requests.append(kwargs)
+            count = min(kwargs["Limit"], 3)
+            return {"Items": [{}] * count, "Count": count, "ScannedCount": count, "LastEvaluatedKey": {"n": len(self.requests)}}
+
+    table = Table()
+    pages = list(DynamoDataRepository(None)._query_hydrocron_table(table, {}, 8))
+    assert [page["Count"] for page in pages] == [3, 3, 2]
+    assert [request["Limit"] for request in table.requests] == [8, 5, 2]
+    assert table.requests[2]["ExclusiveStartKey"] == {"n": 2}
+
+
+def test_table_descriptors():
+    """
+    Test table handles and key schemas are cached without describing tables,
+    and a table is described once when it is not found.
+    """
+
+    from botocore.exceptions import ClientError
+    from hydrocron.api.data_access.db import DynamoDataRepository, TABLE_DESCRIPTORS
+
+    class Resource:
+        def __init__(self):
+            self.tables = []
+
+        def Table(self, name):
+            self.tables.append(Table(name))
+            return self.tables[-1]
+
+    class Table:
+        missing = True
+
+        def __init__(self, name):
+            self.name = name
+            self.loads = 0
+            self.key_schema = [{"AttributeName": "reach_id", "KeyType": "HASH"},
+                               {"AttributeName": "range_start_time", "KeyType": "RANGE"}]
+
+        def load(self):
+            self.loads += 1
+
+        def query(self, **kwargs):
+            if Table.missing:
+                Table.missing = False
+                raise ClientError({"Error": {"Code": "ResourceNotFoundException"}}, "Query")
+            return {"Items": [{"reach_id": "1"}], "Count": 1, "ScannedCount": 1, "ResponseMetadata": {}}
+
+    descriptor = TABLE_DESCRIPTORS.get("SWOT_L2_HR_RiverSP_D", "Reach")
+    assert descriptor == {"table_name": "hydrocron-SWOT_L2_HR_RiverSP_D-reach-table",
+                          "partition_key": "reach_id", "sort_key": "range_start_time"}
+    assert TABLE_DESCRIPTORS.get("SWOT_L2_HR_RiverSP_D", "Lake") is None
+
+    resource = Resource()
+    data_repository = DynamoDataRepository(resource)
+    args = ("SWOT_L2_HR_RiverSP_D", "Reach", "1", "2024-01-01T00:00:00Z", "2024-02-01T00:00:00Z")
+    assert data_repository.get_series_by_feature_id(*args)["Count"] == 1
+    assert [table.loads for table in resource.tables] == [0, 1]
+    data_repository.get_series_by_feature_id(*args)
+    assert len(resource.tables) == 2 and resource.tables[-1].loads == 1
+
+
+def test_page_token():
+    """
+    Test page tokens round trip and are rejected when tampered with or used
+    for a different request.
+    """
+
+    import hydrocron.api.controllers.timeseries
+
+    last_evaluated_key = {"reach_id": "71224100223", "range_start_time": "2023-06-04T12:00:00Z"}
+    scope = "SWOT_L2_HR_RiverSP_2.0|Reach|71224100223|2023-06-04T00:00:00+0000|2023-06-23T00:00:00+0000"
+    page_token = hydrocron.api.controllers.timeseries.encode_page_token(last_evaluated_key, scope)
+    assert hydrocron.api.controllers.timeseries.decode_page_token(page_token, scope) == last_evaluated_key
+
+    payload, signature = page_token.split(".")
+    tampered = hydrocron.api.controllers.timeseries.encode_page_token(
+        {"reach_id": "71224100224", "range_start_time": "2023-06-04T12:00:00Z"}, scope).split(".")[0]
+    for invalid in (f"{tampered}.{signature}", payload, "not-a-token"):
+        with pytest.raises(hydrocron.api.controllers.timeseries.RequestError) as e:
+            hydrocron.api.controllers.timeseries.decode_page_token(invalid, scope)
+        assert str(e.value) == "400: page_token is not valid for this request"
+
+    with pytest.raises(hydrocron.api.controllers.timeseries.RequestError):
+        hydrocron.api.controllers.timeseries.decode_page_token(page_token, scope.replace("71224100223", "71224100224"))
+
+
+def test_page_token_secret_required():
+    """
+    Test the timeseries controller does not start without a page token
+    secret outside of test and local environments.
+    """
+
+    import subprocess
+    import sys
+
+    env = {**os.environ, "HYDROCRON_ENV": "prod", "DEFAULT_RIVER_COLLECTION": "SWOT_L2_HR_RiverSP",
+           "DEFAULT_LAKE_COLLECTION": "SWOT_L2_HR_LakeSP", "DEFAULT_COLLECTION_VERSION": "D"}
+    env.pop("PAGE_TOKEN_SECRET", None)
+    result = subprocess.run([sys.executable, "-c", "import hydrocron.api.controllers.timeseries"],
+                            env=env, capture_output=True, text=True)
+    assert result.returncode != 0
+    assert "PAGE_TOKEN_SECRET is not set" in result.stderr
+
+    result = subprocess.run([sys.executable, "-c", "import hydrocron.api.controllers.timeseries"],
+                            env={**env, "PAGE_TOKEN_SECRET": "secret"}, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_timeseries_lambda_handler_limit(timeseries_event):
+    """
+    Test the lambda handler for the timeseries endpoint for limit parameter
+    """
+    import hydrocron.api.controllers.timeseries
+
+    event = timeseries_event
+    event["body"]["limit"] = "0"
+
+    context = "_"
+    with pytest.raises(hydrocron.api.controllers.timeseries.RequestError) as e:
+        hydrocron.api.controllers.timeseries.lambda_handler(event, context)
+    assert "400: limit parameter should be a positive integer, not: 0" in str(e.value)
+
+    event["body"]["limit"] = "10"
+    event["body"].pop("output")
+    event["headers"]["Accept"] = "text/csv"
+    with pytest.raises(hydrocron.api.controllers.timeseries.RequestError) as e:
+        hydrocron.api.controllers.timeseries.lambda_handler(event, context)
+    assert "400: limit and page_token parameters are only supported for application/json responses" in str(e.value)
+
+
+def test_response_cache(timeseries_event):
+    """
+    Test the response cache LRU eviction, expiry and ingest watermark
+    invalidation.
+    """
+
+    from hydrocron.api.data_access.cache import ResponseCache
+
+    now = [0]
+    request = timeseries_event["body"]
+    collection = ("SWOT_L2_HR_RiverSP_D", request["feature"])
+
+    def key(feature_id):
+        return (collection[0], request["feature"], feature_id, request["start_time"], request["end_time"], request["fields"], request["output"], False)
+
+    cache = ResponseCache(max_size=100, ttl=60, clock=lambda: now[0])
+    cache.observe_ingest_time(collection, "2024-01-01T00:00:00Z")
+
+    cache.put(key("a"), collection, "response a", 40)
+    cache.put(key("b"), collection, "response b", 40)
+    assert cache.get(key("a"), collection) == "response a"
+    cache.put(key("c"), collection, "response c", 40)    # Evicts b, the least recently used
+    assert cache.get(key("b"), collection) is None
+    assert cache.get(key("a"), collection) == "response a"
+    cache.put(key("d"), collection, "response d", 101)    # Larger than the cache
+    assert cache.get(key("d"), collection) is None
+
+    cache.observe_ingest_time(collection, "2023-01-01T00:00:00Z")    # Older ingest does not invalidate
+    assert cache.get(key("c"), collection) == "response c"
+    cache.observe_ingest_time(collection, "2024-02-01T00:00:00Z")
+    assert cache.get(key("c"), collection) is None
+
+    cache.put(key("e"), collection, "response e", 10)
+    now[0] = 60
+    assert cache.get(key("e"), collection) is None
+
+    assert cache.stats() == {"hits": 3, "misses": 4, "evictions": 1, "invalidations": 2, "entries": 1, "size": 40}
+    assert not ResponseCache().enabled
 
 
 def test_timeseries_lambda_handler_missing():
@@ -330,6 +810,46 @@ def test_timeseries_lambda_handler_feature_id():
         assert "400: feature_id cannot contain letters: 7122ff4100223" in str(e.value)
 
 
+def test_timeseries_lambda_handler_feature_id_list(timeseries_event):
+    """
+    Test the lambda handler for the timeseries endpoint for a list of feature_id values
+    """
+    import hydrocron.api.controllers.timeseries
+
+    event = timeseries_event
+    event["body"]["feature_id"] = ",".join(str(71224100223 + i) for i in range(hydrocron.api.controllers.timeseries.MAX_FEATURE_IDS + 1))
+
+    context = "_"
+    with pytest.raises(hydrocron.api.controllers.timeseries.RequestError) as e:
+        hydrocron.api.controllers.timeseries.lambda_handler(event, context)
+    assert f"400: feature_id should contain at most {hydrocron.api.controllers.timeseries.MAX_FEATURE_IDS} IDs" in str(e.value)
+
+    event["body"]["feature_id"] = "71224100223, 71224100224"
+    event["body"]["limit"] = "10"
+    with pytest.raises(hydrocron.api.controllers.timeseries.RequestError) as e:
+        hydrocron.api.controllers.timeseries.lambda_handler(event, context)
+    assert "400: limit and page_token parameters are only supported for a single feature_id" in str(e.value)
+
+
+def test_get_series_by_feature_ids(hydrocron_api):
+    """
+    Test querying several features returns each feature's series in the
+    order requested.
+    """
+
+    from hydrocron.api.data_access.db import DynamoDataRepository
+    import hydrocron.utils.connection
+
+    data_repository = DynamoDataRepository(hydrocron.utils.connection._dynamodb_resource)
+    args = ("SWOT_L2_HR_RiverSP_2.0", "Reach")
+    time_range = ("2023-06-04T00:00:00+0000", "2023-06-23T00:00:00+0000")
+    feature_ids = ["71224100223", "71224100224", "71224100223"]
+
+    results = data_repository.get_series_by_feature_ids(*args, feature_ids, *time_range)
+    assert [result["Items"] for result in results] == \
+        [data_repository.get_series_by_feature_id(*args, feature_id, *time_range)["Items"] for feature_id in feature_ids]
+
+
 def test_timeseries_lambda_handler_dates():
     """
     Test the lambda handler for the timeseries endpoint for start_time and 
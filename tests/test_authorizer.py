@@ -92,4 +92,31 @@ class TestAuthorizer(unittest.TestCase):
             "usageIdentifierKey": "def456"
         }
         
-        self.assertEqual(result, expected_policy)
\ No newline at end of file
+        self.assertEqual(result, expected_policy)
+
+    def test_api_key_store_refresh(self):
+        """
+        Test API keys are read on first use, cached policies are reused and
+        rotated keys are picked up once the TTL has passed.
+        """
+        from hydrocron.api.controllers.authorizer import ApiKeyStore
+
+        now = [0]
+        store = ApiKeyStore(ttl=60, clock=lambda: now[0])
+        self.assertEqual(store.keys(), ("abc123", frozenset(["def456", "qrs789"])))
+
+        arn = "arn:aws:execute-api:us-west-2:xxxx:xxxx/v1/GET/timeseries"
+        policy = store.get_policy("qrs789", arn)
+        self.assertEqual(policy["principalId"], "trusted_partner")
+        policy["principalId"] = "changed"
+        self.assertEqual(store.get_policy("qrs789", arn)["principalId"], "trusted_partner")
+        self.assertEqual(store.get_policy("unknown", arn), store.get_policy("", arn))
+        self.assertEqual(len(store._policies), 2)
+
+        ssm = boto3.client("ssm")
+        ssm.put_parameter(Name="/service/hydrocron/api-key-trusted", Value='["def456"]', Type="SecureString", Overwrite=True)
+        now[0] = 30
+        self.assertEqual(store.get_policy("qrs789", arn)["principalId"], "trusted_partner")
+        now[0] = 61
+        self.assertEqual(store.get_policy("qrs789", arn)["principalId"], "default_user")
+        self.assertEqual(store.get_policy("qrs789", arn)["usageIdentifierKey"], "abc123")
@@ -34,4 +34,41 @@ def test_ssm_client():
 
     # Import module
     from hydrocron.utils import connection
-    assert type(connection.sns_client).__name__ == "SNS"   
\ No newline at end of file
+    assert type(connection.sns_client).__name__ == "SNS"   
+
+
+def test_shared_session_config():
+    """Test resources and clients share one session and botocore config."""
+
+    from hydrocron.utils import connection
+    assert connection.session is connection.session
+    assert connection.config.max_pool_connections == int(os.getenv('AWS_MAX_POOL_CONNECTIONS', '50'))
+    assert connection.config.retries['mode'] == 'adaptive'
+    assert connection.lambda_client.meta.config.max_pool_connections == connection.config.max_pool_connections
+    assert connection.ssm_client is connection.ssm_client
+
+
+def test_dynamodb_endpoint_lazy(monkeypatch):
+    """Test the DynamoDB endpoint is resolved on first use, cached and
+    read from the environment override without calling SSM."""
+
+    from hydrocron.utils import connection
+    monkeypatch.setenv('HYDROCRON_ENV', 'prod')
+    monkeypatch.setenv('HYDROCRON_dynamodb_endpoint_url', 'http://localhost:8000')
+    prod_connection = type(connection)('prod_connection')
+    prod_connection._ssm_client = object()   # Any SSM call fails
+    assert prod_connection._dynamodb_endpoint_expires is None
+    assert prod_connection.dynamodb_endpoint == 'http://localhost:8000'
+
+    monkeypatch.setenv('HYDROCRON_dynamodb_endpoint_url', 'http://localhost:8001')
+    assert prod_connection.dynamodb_endpoint == 'http://localhost:8000'
+
+    monkeypatch.setenv('DYNAMODB_ENDPOINT_TTL', '60')
+    prod_connection._dynamodb_endpoint_expires = 0
+    prod_connection._dynamodb_resource = object()
+    assert prod_connection.dynamodb_endpoint == 'http://localhost:8001'
+    assert prod_connection._dynamodb_resource is None
+
+    monkeypatch.setenv('HYDROCRON_dynamodb_endpoint_url', '')
+    prod_connection._dynamodb_endpoint_expires = 0
+    assert prod_connection.dynamodb_endpoint is None
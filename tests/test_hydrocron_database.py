@@ -93,3 +93,265 @@ def test_track_table_mismatch():
     with pytest.raises(hydrocron.db.load_data.MissingTable) as e:
         hydrocron.db.load_data.granule_handler(event, None)
         assert str(e.value) == "Error: Cannot load Observed or Unassigned Lake data"
+
+
+def test_granule_batches(monkeypatch):
+    """
+    Test granules are dispatched in JSON batches and a batch is loaded
+    concurrently, retrying only the failed granules in a new invocation and
+    raising the first failure when every granule failed
+    """
+    import json
+    import hydrocron.db.load_data
+
+    class LambdaClient:
+        def __init__(self):
+            self.payloads = []
+
+        def invoke(self, FunctionName, InvocationType, Payload):
+            self.payloads.append(json.loads(Payload))
+
+    monkeypatch.setenv("GRANULE_LAMBDA_FUNCTION_NAME", "load-granule")
+    granules = [{"granule_path": f'granule_"{i}".zip', "load_benchmarking_data": "False"} for i in range(5)]
+    client = LambdaClient()
+    assert hydrocron.db.load_data.invoke_granule_loads(client, granules, batch_size=2) == 3
+    assert client.payloads[0] == {"body": {"granules": granules[:2]}}
+    assert client.payloads[2] == {"body": granules[4]}
+
+    loaded = []
+    retried = []
+
+    def load_granule(request):
+        loaded.append(request["granule_path"])
+        if request in (granules[1], granules[3]):
+            raise hydrocron.db.load_data.MissingTable("missing")
+
+    monkeypatch.setattr(hydrocron.db.load_data, "load_granule", load_granule)
+    monkeypatch.setattr(hydrocron.db.load_data, "invoke_granule_loads",
+                        lambda lambda_client, failed, batch_size: retried.append((failed, batch_size)))
+    hydrocron.db.load_data.granule_handler({"body": {"granules": granules}}, None)
+    assert sorted(loaded) == sorted(granule["granule_path"] for granule in granules)
+    assert retried == [([granules[1], granules[3]], 2)]
+
+    with pytest.raises(hydrocron.db.load_data.MissingTable):
+        hydrocron.db.load_data.granule_handler({"body": {"granules": [granules[1], granules[3]]}}, None)
+    assert len(retried) == 1
+
+
+def test_skip_unchanged_granule(monkeypatch):
+    """
+    Test a granule ingested with the same checksum and all its features
+    is skipped before it is read unless the load is forced
+    """
+    import boto3
+    from moto import mock_aws
+    import hydrocron.db.load_data
+    from hydrocron.api.data_access.db import DynamoDataRepository
+
+    track_table = "hydrocron-swot-reach-track-ingest-table"
+    granule_ur = "SWOT_L2_HR_RiverSP_Reach_020_150_NA_20240825T234434_20240825T235245_PIC0_01.zip"
+    with mock_aws():
+        dynamo_resource = boto3.resource("dynamodb", region_name="us-west-2")
+        table = dynamo_resource.create_table(
+            TableName=track_table,
+            KeySchema=[{"AttributeName": "granuleUR", "KeyType": "HASH"},
+                       {"AttributeName": "revision_date", "KeyType": "RANGE"}],
+            AttributeDefinitions=[{"AttributeName": "granuleUR", "AttributeType": "S"},
+                                  {"AttributeName": "revision_date", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST")
+        table.put_item(Item={"granuleUR": granule_ur, "revision_date": "2024-08-26T00:00:00", "checksum": "abc",
+                             "expected_feature_count": 52, "actual_feature_count": 52})
+        table.put_item(Item={"granuleUR": granule_ur, "revision_date": "2024-08-27T00:00:00", "checksum": "def",
+                             "expected_feature_count": 52, "actual_feature_count": 0, "status": "to_ingest"})
+
+        data_repository = DynamoDataRepository(dynamo_resource)
+        assert hydrocron.db.load_data.granule_unchanged(data_repository, track_table, granule_ur, "abc")
+        assert not hydrocron.db.load_data.granule_unchanged(data_repository, track_table, granule_ur, "def")
+        assert not hydrocron.db.load_data.granule_unchanged(data_repository, track_table, granule_ur, "Not Found")
+        assert not hydrocron.db.load_data.granule_unchanged(data_repository, track_table, "other.zip", "abc")
+
+    read = []
+    monkeypatch.setattr(hydrocron.db.load_data, "DynamoDataRepository", lambda dynamo_resource: None)
+    monkeypatch.setattr(hydrocron.db.load_data, "granule_unchanged", lambda *args: True)
+    monkeypatch.setattr(hydrocron.db.load_data, "read_data", lambda *args: read.append(args) or [])
+    monkeypatch.setattr(hydrocron.db.load_data, "load_data", lambda *args, **kwargs: None)
+    monkeypatch.setattr(hydrocron.db.load_data, "INGEST_CHUNK_SIZE", 0)
+    monkeypatch.setenv("OBSCURE_DATA", "false")
+    request = {"granule_path": f"s3://bucket/SWOT_L2_HR_RiverSP_2.0/{granule_ur}", "checksum": "abc",
+               "load_benchmarking_data": "False"}
+    hydrocron.db.load_data.load_granule(request)
+    assert not read
+    hydrocron.db.load_data.load_granule({**request, "force": "True"})
+    assert len(read) == 1
+
+
+def test_memory_sampler():
+    """
+    Test the memory sampler measures the peak while a granule is loaded
+    rather than the peak of the process and counts concurrent loads
+    """
+    import time
+    from hydrocron.db.load_data import MemorySampler
+
+    data = b"x" * 64 * 2**20
+    del data
+
+    with MemorySampler(interval=0.01) as memory, MemorySampler(interval=0.01) as other:
+        data = b"x" * 32 * 2**20
+        time.sleep(0.05)
+        del data
+    assert 24 <= memory.peak - memory.before < 64
+    assert memory.concurrent == other.concurrent == 2
+
+    with MemorySampler(interval=0.01) as memory:
+        time.sleep(0.05)
+    assert memory.peak - memory.before < 8 and memory.concurrent == 1
+
+
+def test_table_registry():
+    """
+    Test registered tables are constructed from known key schemas without
+    describing them and unknown tables are described once.
+    """
+    from hydrocron.db import HydrocronTable
+
+    class Table:
+        def __init__(self, name):
+            self.name = name
+            self.loads = 0
+            self.key_schema = [{"AttributeName": "lake_id", "KeyType": "HASH"},
+                               {"AttributeName": "range_start_time", "KeyType": "RANGE"}]
+
+        def load(self):
+            self.loads += 1
+
+    class Resource:
+        def __init__(self):
+            self.tables = []
+
+        def Table(self, name):
+            self.tables.append(Table(name))
+            return self.tables[-1]
+
+    resource = Resource()
+    reach_table = HydrocronTable.get(resource, constants.SWOT_REACH_TABLE_NAME)
+    assert (reach_table.partition_key_name, reach_table.sort_key_name) == ("reach_id", "range_start_time")
+    track_table = HydrocronTable.get(resource, constants.SWOT_REACH_TRACK_INGEST_TABLE_NAME)
+    assert (track_table.partition_key_name, track_table.sort_key_name) == ("granuleUR", "revision_date")
+    assert HydrocronTable.get(resource, constants.SWOT_REACH_TABLE_NAME) is reach_table
+
+    test_table = HydrocronTable.get(resource, constants.DB_TEST_PLAKE_TABLE_NAME)
+    assert test_table.partition_key_name == "lake_id"
+    assert HydrocronTable.get(resource, constants.DB_TEST_PLAKE_TABLE_NAME) is test_table
+    assert sum(table.loads for table in resource.tables) == 1
+
+    HydrocronTable.evict(constants.SWOT_REACH_TABLE_NAME)
+    HydrocronTable.evict(constants.SWOT_REACH_TRACK_INGEST_TABLE_NAME)
+    HydrocronTable.evict(constants.DB_TEST_PLAKE_TABLE_NAME)
+
+
+def test_parallel_batch_writer():
+    """
+    Test items are written in batches of 25 and unprocessed items are
+    retried with backoff.
+    """
+    import threading
+    from hydrocron.db.batch_writer import ParallelBatchWriter
+
+    class Client:
+        def __init__(self):
+            self.requests = []
+            self.lock = threading.Lock()
+
+        def batch_write_item(self, RequestItems):
+            requests = RequestItems["table"]
+            with self.lock:
+                self.requests.append(len(requests))
+                first = len(self.requests) == 1
+            unprocessed = {"table": requests[:5]} if first else {}
+            return {"UnprocessedItems": unprocessed}
+
+    delays = []
+    client = Client()
+    items = [{"reach_id": str(i)} for i in range(60)]
+    stats = ParallelBatchWriter(client, "table", max_workers=3, sleep=delays.append).write(items)
+    assert sorted(client.requests) == [5, 10, 25, 25]
+    assert stats["batches"] == 3 and stats["written"] == 60 and stats["unprocessed"] == 0
+    assert stats["throttled"] == 1 and len(delays) == 1 and 0 <= delays[0] <= 0.05
+
+    client = Client()
+    stats = ParallelBatchWriter(client, "table", max_workers=1, sleep=delays.append).write(item for item in items)
+    assert stats["items"] == 60 and stats["batches"] == 3 and stats["written"] == 60
+
+    class ThrottledClient:
+        def batch_write_item(self, RequestItems):
+            return {"UnprocessedItems": RequestItems}
+
+    delays = []
+    stats = ParallelBatchWriter(ThrottledClient(), "table", max_retries=2, sleep=delays.append).write(items[:3])
+    assert stats["written"] == 0 and stats["unprocessed"] == 3 and stats["throttled"] == 3
+    assert len(delays) == 2
+
+
+def test_batch_fill_table_unprocessed(monkeypatch):
+    """
+    Test the table write fails when items are still unprocessed after all
+    retries.
+    """
+    from types import SimpleNamespace
+    from hydrocron.db import HydrocronTable
+    from hydrocron.db.batch_writer import ParallelBatchWriter, UnprocessedItems
+
+    monkeypatch.setattr(ParallelBatchWriter, "MAX_RETRIES", 1)
+
+    class ThrottledClient:
+        def __init__(self):
+            self.requests = 0
+
+        def batch_write_item(self, RequestItems):
+            self.requests += 1
+            return {"UnprocessedItems": RequestItems}
+
+    client = ThrottledClient()
+    table = SimpleNamespace(name="table", meta=SimpleNamespace(client=client))
+    resource = SimpleNamespace(Table=lambda table_name: table)
+    hydrocron_table = HydrocronTable(resource, "table", key_schema=("reach_id", "range_start_time"))
+
+    items = [{"reach_id": str(i), "range_start_time": "2024-01-01T00:00:00Z"} for i in range(30)]
+    with pytest.raises(UnprocessedItems) as e:
+        hydrocron_table.batch_fill_table(items, max_workers=2)
+    assert str(e.value) == "30 items were not written to table table"
+    assert e.value.stats["written"] == 0 and e.value.stats["unprocessed"] == 30
+    assert client.requests == 2 * 2
+
+
+def test_item_size():
+    """
+    Test item sizes follow DynamoDB's item size rules and oversized item
+    policies shorten the geometry until the item fits.
+    """
+    from decimal import Decimal
+    from hydrocron.db import item_size
+
+    assert item_size.item_size({"reach_id": "71224100223", "wse": "é"}) == 8 + 11 + 3 + 2
+    assert item_size.attribute_size(Decimal("123.45")) == 4
+    assert item_size.attribute_size(Decimal("0.00100")) == 2
+    assert item_size.attribute_size(0) == 2
+    assert item_size.attribute_size(True) == 1
+    assert item_size.attribute_size({"a": "bc", "d": [1, None]}) == 3 + (1 + 2 + 1) + (1 + (3 + 2 + 1 + 1 + 1) + 1)
+    assert item_size.attribute_size({"x", "yz"}) == 3
+
+    coordinates = ", ".join(f"-95.{i:08d}123 29.{i:08d}456" for i in range(1000))
+    item = {"reach_id": "71224100223", "geometry": f"LINESTRING ({coordinates})"}
+    size = item_size.item_size(item)
+    assert item_size.get_oversize_policy("skip")(item, size - 1) is None
+
+    truncated = item_size.get_oversize_policy("truncate_geometry")(item, size - 1)
+    assert truncated["geometry"].startswith("LINESTRING (-95.000000 29.000000, -95.000000 29.000000")
+    assert item_size.item_size(truncated) <= size - 1
+
+    simplified = item_size.get_oversize_policy("simplify_geometry")(item, size // 2)
+    assert simplified["geometry"].startswith("LINESTRING (") and item_size.item_size(simplified) <= size // 2
+
+    with pytest.raises(ValueError):
+        item_size.get_oversize_policy("unknown")
@@ -9,6 +9,7 @@ Unit tests for unpacking swot reach and node shapefiles.
 from datetime import datetime, timedelta, timezone
 import pytz
 import numpy as np
+import pytest
 from shapely import Polygon, Point, geometry, wkt, centroid
 from hydrocron.utils import constants
 
@@ -144,3 +145,133 @@ def test_read_benchmarking_data():
     items = swot_shp.load_benchmarking_data()
 
     assert len(items) == 1199
+
+
+def test_read_shapefile_s3():
+    """
+    Tests a granule read from S3 in memory matches the local file
+    """
+    import os
+    import boto3
+    import moto
+
+    filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'data',
+                            'SWOT_L2_HR_RiverSP_Reach_049_058_AU_20260419T185249_20260419T190852_PID0_01.zip')
+    key = f"SWOT_L2_HR_RiverSP_D/{os.path.basename(filepath)}"
+
+    with moto.mock_aws():
+        s3_resource = boto3.resource("s3", region_name="us-west-2")
+        s3_resource.Bucket("podaac-swot-ops-cumulus-protected").create(CreateBucketConfiguration={"LocationConstraint": "us-west-2"})
+        s3_resource.Bucket("podaac-swot-ops-cumulus-protected").upload_file(Filename=filepath, Key=key)
+
+        with open(filepath, 'rb') as granule_file:
+            assert swot_shp.read_granule(f"s3://podaac-swot-ops-cumulus-protected/{key}", s3_resource) == granule_file.read()
+        items = swot_shp.read_shapefile(f"s3://podaac-swot-ops-cumulus-protected/{key}", False,
+                                        constants.REACH_DATA_COLUMNS, s3_resource=s3_resource)
+
+    local_items = swot_shp.read_shapefile(filepath, False, constants.REACH_DATA_COLUMNS)
+    assert len(items) == len(local_items) == 52
+    assert [item['reach_id'] for item in items] == [item['reach_id'] for item in local_items]
+    assert items[0]['geometry'] == local_items[0]['geometry']
+
+
+def test_read_granule_layer_arrow():
+    """
+    Tests the Arrow reader produces the same items as the geopandas reader
+    and reads only the requested fields
+    """
+    import os
+    pytest.importorskip("pyarrow")
+
+    filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'data',
+                            'SWOT_L2_HR_RiverSP_Reach_049_058_AU_20260419T185249_20260419T190852_PID0_01.zip')
+    with open(filepath, 'rb') as granule_file:
+        granule = granule_file.read()
+
+    attributes = {'granuleUR': os.path.basename(filepath)}
+    arrow_items = swot_shp.assemble_attributes(swot_shp.read_granule_layer(granule, use_arrow=True), attributes)
+    items = swot_shp.assemble_attributes(swot_shp.read_granule_layer(granule, use_arrow=False), attributes)
+    assert arrow_items == items
+    assert [list(item) for item in arrow_items] == [list(item) for item in items]
+
+    layer = swot_shp.read_granule_layer(granule, ['reach_id', 'wse', 'dschg_c_q'], use_arrow=True)
+    assert list(layer.columns) == ['reach_id', 'wse', 'dschg_c_q', 'geometry']
+    assert layer['wse'][0] == items[0]['wse'] and layer['dschg_c_q'][0] == items[0]['dschg_c_q']
+
+
+def test_read_granule_layer_arrow_nulls(tmp_path):
+    """
+    Tests the Arrow reader formats missing values as the geopandas reader does
+    """
+    import io
+    import zipfile
+    import geopandas as gpd
+    import pandas as pd
+    pytest.importorskip("pyarrow")
+
+    geodf = gpd.GeoDataFrame({
+        'n_nodes': pd.array([1, None, 3], dtype='Int64'),
+        'n_chan': [1, 2, 3],
+        'wse': [1.5, None, 2.0],
+        'river_name': ['a', None, 'c']
+    }, geometry=[Point(0, 0), Point(1, 1), Point(2, 2)], crs='EPSG:4326')
+    geodf.to_file(tmp_path / 'granule.shp')
+    granule = io.BytesIO()
+    with zipfile.ZipFile(granule, 'w') as granule_zip:
+        for path in tmp_path.glob('granule.*'):
+            granule_zip.write(path, path.name)
+
+    arrow_items = swot_shp.assemble_attributes(swot_shp.read_granule_layer(granule.getvalue(), use_arrow=True), {})
+    items = swot_shp.assemble_attributes(swot_shp.read_granule_layer(granule.getvalue(), use_arrow=False), {})
+    assert [item['n_nodes'] for item in arrow_items[::2]] == [item['n_nodes'] for item in items[::2]] == ['1.0', '3.0']
+    assert [item['n_chan'] for item in arrow_items] == [item['n_chan'] for item in items] == ['1', '2', '3']
+    assert arrow_items[0] == items[0]
+    for name in ('n_nodes', 'wse', 'river_name'):
+        assert pd.isna(arrow_items[1][name]) and pd.isna(items[1][name])
+
+
+def test_read_shapefile_chunks(monkeypatch):
+    """
+    Tests reading a granule in chunks produces the same items as reading
+    it whole, with either reader
+    """
+    import os
+
+    filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'data',
+                            'SWOT_L2_HR_LakeSP_Prior_033_506_AU_20250605T225724_20250605T230824_PID0_01.zip')
+    items = swot_shp.read_shapefile(filepath, obscure_data=False, columns=constants.PRIOR_LAKE_DATA_COLUMNS)
+
+    for reader in ('arrow', 'geopandas'):
+        monkeypatch.setattr(swot_shp, 'SHAPEFILE_READER', reader)
+        feature_count, chunks = swot_shp.read_shapefile_chunks(
+            filepath, obscure_data=False, columns=constants.PRIOR_LAKE_DATA_COLUMNS, chunk_size=250)
+        chunks = list(chunks)
+        assert feature_count == len(items)
+        assert len(chunks) > 1 and all(len(chunk) <= 250 for chunk in chunks)
+        chunk_items = [item for chunk in chunks for item in chunk]
+        assert [{**item, 'ingest_time': ''} for item in chunk_items] == [{**item, 'ingest_time': ''} for item in items]
+
+
+def test_iter_items():
+    """
+    Tests column-wise item assembly gives the same strings as astype(str),
+    keeps missing values and shares the file attributes
+    """
+    import geopandas as gpd
+
+    geodf = gpd.GeoDataFrame({
+        'reach_id': ['71224100223', '71224100233'],
+        'wse': [0.1 + 0.2, np.nan],
+        'n_nodes': np.array([-999, 12], dtype=np.int32),
+        'p_length': [1e16, -999999999999.0]
+    }, geometry=[Point(171.19838157727043, -42.44318035169461), None])
+    attributes = {'granuleUR': 'granule.zip', 'reach_id': 'replaced'}
+
+    items = list(swot_shp.iter_items(geodf, attributes))
+    expected = geodf.astype(str).assign(**attributes).to_dict('records')
+    assert [list(item) for item in items] == [list(item) for item in expected]
+    assert items[0] == expected[0]
+    assert items[0]['wse'] == '0.30000000000000004' and items[0]['p_length'] == '1e+16'
+    assert np.isnan(items[1]['wse']) and np.isnan(items[1]['geometry'])
+    assert items[1]['n_nodes'] == '12' and items[1]['p_length'] == '-999999999999.0'
+    assert items[0]['granuleUR'] is items[1]['granuleUR'] and items[1]['reach_id'] == 'replaced'